@@ -2,18 +2,99 @@
 
 
 import json
+import threading
 from datetime import datetime
 from typing import Optional
 import requests
 
 
-from singer import utils
-from singer_sdk.authenticators import OAuthAuthenticator, SingletonMeta
+from singer_sdk.authenticators import OAuthAuthenticator
 from singer_sdk.helpers._util import utc_now
 from singer_sdk.streams import Stream as RESTStreamBase
 
 
-class ProxyGoogleAdsAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
+class CredentialsSingletonMeta(type):
+    """Create a single instance per class and set of credentials.
+
+    Like the SDK's SingletonMeta, streams share one authenticator and its token.
+    Instances are keyed by every argument but `stream`, so taps with different
+    credentials in one process (e.g. daemon jobs) never share a token. Instances
+    are created under a lock so concurrent threads never create two.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(cls, name, bases, dic):
+        super().__init__(name, bases, dic)
+        cls._instances = {}
+
+    def __call__(cls, *args, stream: RESTStreamBase, **kwargs):
+        key = json.dumps([args, kwargs], sort_keys=True, default=str)
+        with CredentialsSingletonMeta._lock:
+            if key not in cls._instances:
+                cls._instances[key] = super().__call__(*args, stream=stream, **kwargs)
+            return cls._instances[key]
+
+
+class SingleFlightRefreshMixin:
+    """Thread-safe access token refresh for authenticators shared by workers.
+
+    Only one thread refreshes an expired token while the others wait for it,
+    and tokens are refreshed shortly before they expire rather than after.
+    """
+
+    # Tokens are refreshed this many seconds before they expire
+    expiry_margin_seconds = 300
+
+    access_token: Optional[str]
+    last_refreshed: Optional[datetime]
+    expires_in: Optional[int]
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)  # type: ignore
+        self._refresh_lock = threading.Lock()
+
+    def is_token_valid(self) -> bool:
+        """Check if token is valid.
+
+        Returns:
+            True if the token is valid and not about to expire.
+        """
+        if self.last_refreshed is None:
+            return False
+        if not self.expires_in:
+            return True
+        margin = min(self.expiry_margin_seconds, self.expires_in // 2)
+        token_age = (utc_now() - self.last_refreshed).total_seconds()
+        return self.expires_in - margin > token_age
+
+    def ensure_valid_token(self) -> None:
+        """Refresh the access token, once for all waiting threads, if needed."""
+        if self.is_token_valid():
+            return
+        with self._refresh_lock:
+            if not self.is_token_valid():
+                self.update_access_token()  # type: ignore
+
+    def refresh_rejected_token(self, rejected_token: Optional[str]) -> None:
+        """Refresh the access token after the API rejected `rejected_token`.
+
+        Threads rejected with the same token share a single refresh.
+        """
+        with self._refresh_lock:
+            if self.access_token == rejected_token:
+                self.update_access_token()  # type: ignore
+
+    @property
+    def auth_headers(self) -> dict:
+        """Return the request headers, refreshing the access token if needed."""
+        self.ensure_valid_token()
+        return super().auth_headers  # type: ignore
+
+
+class ProxyGoogleAdsAuthenticator(
+    SingleFlightRefreshMixin, OAuthAuthenticator, metaclass=CredentialsSingletonMeta
+):
     """API Authenticator for Proxy OAuth 2.0 flows."""
 
     def __init__(
@@ -43,20 +124,6 @@ class ProxyGoogleAdsAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
         self.last_refreshed: Optional[datetime] = None
         self.expires_in: Optional[int] = None
 
-    def is_token_valid(self) -> bool:
-        """Check if token is valid.
-
-        Returns:
-            True if the token is valid (fresh).
-        """
-        if self.last_refreshed is None:
-            return False
-        if not self.expires_in:
-            return True
-        if self.expires_in > (utils.now() - self.last_refreshed).total_seconds():
-            return True
-        return False
-
     # Authentication and refresh
     def update_access_token(self) -> None:
         """Update `access_token` along with: `last_refreshed` and `expires_in`.
@@ -89,9 +156,12 @@ class ProxyGoogleAdsAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
         return {}
 
 
-# The SingletonMeta metaclass makes your streams reuse the same authenticator instance.
-# If this behaviour interferes with your use-case, you can remove the metaclass.
-class GoogleAdsAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
+# The CredentialsSingletonMeta metaclass makes your streams reuse the same
+# authenticator instance. If this behaviour interferes with your use-case, you can
+# remove the metaclass.
+class GoogleAdsAuthenticator(
+    SingleFlightRefreshMixin, OAuthAuthenticator, metaclass=CredentialsSingletonMeta
+):
     """Authenticator class for GoogleAds."""
 
     @property
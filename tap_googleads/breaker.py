@@ -0,0 +1,85 @@
+"""Per-customer circuit breaker for inaccessible accounts."""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+import singer
+
+LOGGER = singer.get_logger()
+
+# Google Ads error codes meaning a customer cannot be queried at all
+ACCESS_ERROR_CODES = {"USER_PERMISSION_DENIED", "CUSTOMER_NOT_ENABLED"}
+SECONDS_PER_HOUR = 60 * 60
+# Hours a saved customer is skipped for when no TTL is configured
+DEFAULT_TTL_HOURS = 24
+
+
+def access_error_code(response: requests.Response) -> Optional[str]:
+    """Return the access error code of a failed response, if it has one."""
+    if response.status_code < 400:
+        return None
+    try:
+        details = response.json().get("error", {}).get("details", [])
+    except ValueError:
+        return None
+    for detail in details:
+        for error in detail.get("errors", []):
+            for error_code in error.get("errorCode", {}).values():
+                if error_code in ACCESS_ERROR_CODES:
+                    return error_code
+    return None
+
+
+class CustomerCircuitBreaker:
+    """Remember customers that cannot be accessed so their streams are skipped.
+
+    A customer is skipped for the rest of the run once a request for it fails
+    with one of `ACCESS_ERROR_CODES`. When `path` is set, skipped customers
+    are also saved and skipped by later runs for `ttl_hours`.
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, ttl_hours: Optional[float] = None
+    ) -> None:
+        """Create a new circuit breaker.
+
+        Args:
+            path: JSON file the skipped customers are saved to.
+            ttl_hours: Hours a saved customer is skipped for, defaults to
+                `DEFAULT_TTL_HOURS`.
+        """
+        self.path = Path(path) if path else None
+        self.ttl_hours = DEFAULT_TTL_HOURS if ttl_hours is None else ttl_hours
+        # Customer id -> {"reason": error code, "until": epoch seconds}
+        self.skipped: Dict[str, dict] = {}
+        if self.path is not None and self.path.exists():
+            now = time.time()
+            saved = json.loads(self.path.read_text())
+            self.skipped = {
+                customer_id: status
+                for customer_id, status in saved.items()
+                if status.get("until", 0) > now
+            }
+
+    def is_open(self, customer_id: Optional[str]) -> bool:
+        """Return whether the streams of a customer are skipped."""
+        return customer_id in self.skipped
+
+    def trip(self, customer_id: str, reason: str) -> None:
+        """Skip the remaining streams of a customer."""
+        if customer_id in self.skipped:
+            return
+        LOGGER.warning(
+            f"Skipping remaining streams of customer {customer_id}: {reason}."
+        )
+        until = time.time() + self.ttl_hours * SECONDS_PER_HOUR
+        self.skipped[customer_id] = {"reason": reason, "until": until}
+
+    def close(self) -> None:
+        """Save the skipped customers, when saving them is configured."""
+        if self.path is None:
+            return
+        self.path.write_text(json.dumps(self.skipped, indent=2, sort_keys=True))
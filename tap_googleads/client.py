@@ -1,23 +1,36 @@
 """REST client handling, including GoogleAdsStream base class."""
 
+import re
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Union
+from urllib.parse import parse_qs, urlparse
 import requests
 import singer
 
-from memoization import cached
-
 from singer_sdk.helpers.jsonpath import extract_jsonpath
 from singer_sdk.streams import RESTStream
-from singer_sdk.authenticators import OAuthAuthenticator
 from datetime import datetime, timedelta
 from dateutil import parser
 
 from tap_googleads.auth import GoogleAdsAuthenticator, ProxyGoogleAdsAuthenticator
-
+from tap_googleads.breaker import CustomerCircuitBreaker, access_error_code
+from tap_googleads.dimensions import DimensionIndex
+from tap_googleads.pages import ReportPage
+from tap_googleads.profiling import StreamProfiler
+from tap_googleads.quota import QuotaPlanner
+from tap_googleads.record_index import RecordIndex
+from tap_googleads.replay import RECORD_MODE, REPLAY_MODE, ResponseArchive
 
 SCHEMAS_DIR = Path(__file__).parent / Path("./schemas")
 
+# Report rows are read from this path without going through jsonpath
+RESULTS_JSONPATH = "$.results[*]"
+
+CUSTOMER_URL_PATTERN = re.compile(r"/customers/(\d+)")
+
+# Days of history synced when no `start_date` is configured
+DEFAULT_LOOKBACK_DAYS = 365
+
 LOGGER = singer.get_logger()
 
 
@@ -30,14 +43,43 @@ class GoogleAdsStream(RESTStream):
     next_page_token_jsonpath = "$.nextPageToken"  # Or override `get_next_page_token`.
     _LOG_REQUEST_METRIC_URLS: bool = True
 
-    _end_date = "'" + datetime.now().strftime("%Y-%m-%d") + "'"
-    _start_date = datetime.now() - timedelta(days=365)
-    _start_date = "'" + _start_date.strftime("%Y-%m-%d") + "'"
+    # Set by the tap when `record_index_path` is configured
+    record_index: Optional[RecordIndex] = None
+    # Set by the tap when `profile_dir` is configured
+    profiler: Optional[StreamProfiler] = None
+    # Set by the tap when `enrich_dimensions` is enabled
+    dimension_index: Optional[DimensionIndex] = None
+    # Set by the tap when `daily_operations_budget` is configured
+    quota_planner: Optional[QuotaPlanner] = None
+    # Set by the tap to skip the streams of inaccessible customers
+    customer_breaker: Optional[CustomerCircuitBreaker] = None
+    # Set by the tap when it shares one HTTP session between its streams
+    shared_session: Optional[requests.Session] = None
+    # Customer of the job being synced, its requests are counted against that job
+    _job_customer: Optional[str] = None
+
+    def __init__(
+        self,
+        tap: Any,
+        name: Optional[str] = None,
+        schema: Optional[dict] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        """Initialize the stream, from a given schema instead of its file if any."""
+        if schema is not None:
+            # Shadows the class' schema_filepath, which the SDK would read again
+            self.__dict__["schema_filepath"] = None
+        super().__init__(tap, name=name, schema=schema, path=path)
 
     @property
-    @cached
-    def authenticator(self) -> OAuthAuthenticator:
+    def authenticator(
+        self,
+    ) -> Optional[Union[GoogleAdsAuthenticator, ProxyGoogleAdsAuthenticator]]:
         """Return a new authenticator object."""
+        if self.config.get("replay_mode") == REPLAY_MODE:
+            # Replayed runs never reach the API, so no token is needed
+            return None
+
         base_auth_url = "https://www.googleapis.com/oauth2/v4/token"
         # Silly way to do parameters but it works
 
@@ -76,6 +118,13 @@ class GoogleAdsStream(RESTStream):
             auth_headers=auth_headers,
         )
 
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return the shared HTTP session, or else this stream's own session."""
+        if self.shared_session is not None:
+            return self.shared_session
+        return super().requests_session
+
     @property
     def http_headers(self) -> dict:
         """Return the http headers needed."""
@@ -86,16 +135,171 @@ class GoogleAdsStream(RESTStream):
         headers["login-customer-id"] = self.config["customer_id"]
         return headers
 
+    def prepare_request(
+        self, context: Optional[dict], next_page_token: Optional[Any]
+    ) -> requests.PreparedRequest:
+        """Prepare a request that is retried once if its token is rejected."""
+        request = super().prepare_request(context, next_page_token)
+        request.register_hook("response", self._retry_unauthorized)
+        request.register_hook("response", self._check_customer_access)
+        return request
+
+    def _check_customer_access(
+        self, response: requests.Response, **kwargs
+    ) -> requests.Response:
+        """Trip the circuit breaker of a customer that cannot be accessed."""
+        error_code = access_error_code(response)
+        match = CUSTOMER_URL_PATTERN.search(response.request.url or "")
+        if self.customer_breaker is not None and error_code and match:
+            self.customer_breaker.trip(match.group(1), error_code)
+        return response
+
+    def _retry_unauthorized(
+        self, response: requests.Response, **kwargs
+    ) -> requests.Response:
+        """Resend a request rejected with a 401 once, with a refreshed token."""
+        authenticator = self.authenticator
+        request = response.request
+        if (
+            response.status_code != 401
+            or authenticator is None
+            or getattr(request, "_unauthorized_retry", False)
+        ):
+            return response
+
+        rejected_token = request.headers.get("Authorization", "").replace(
+            "Bearer ", "", 1
+        )
+        self.logger.info("Access token was rejected, retrying with a new one.")
+        authenticator.refresh_rejected_token(rejected_token)
+
+        retry = request.copy()
+        retry.headers.update(authenticator.auth_headers)
+        retry._unauthorized_retry = True  # type: ignore
+        self._record_operation()
+        return self.requests_session.send(retry, **kwargs)
+
+    def get_records(self, context: Optional[dict]) -> Iterable[Dict[str, Any]]:
+        """Return the records of `read_records`, profiled when configured.
+
+        When the stream does not fit in the daily API operations budget, it is
+        deferred to a later run instead. Streams of customers that cannot be
+        accessed are skipped.
+        """
+        client_id = (context or {}).get("client_id")
+        breaker = self.customer_breaker
+        if breaker is not None and breaker.is_open(client_id):
+            self.logger.info(
+                f"Skipping stream '{self.name}' of inaccessible customer {client_id}."
+            )
+            return
+        planner = self.quota_planner
+        if planner is not None and not planner.admit(self.name, client_id):
+            self.logger.warning(
+                f"Deferring stream '{self.name}' of customer {client_id}, it needs "
+                f"about {planner.estimate(self.name, client_id):.0f} API operations "
+                f"and {planner.remaining} are left in today's budget, "
+                f"{planner.reserved(self.name):.0f} of them for higher priority jobs."
+            )
+            return
+        self._job_customer = client_id
+        try:
+            if self.profiler is None:
+                yield from self.read_records(context)
+            else:
+                with self.profiler.profile(self.name):
+                    yield from self.read_records(context)
+        except Exception:
+            # The customer became inaccessible during this sync, skip it
+            if breaker is not None and breaker.is_open(client_id):
+                return
+            raise
+
+    def read_records(self, context: Optional[dict]) -> Iterable[Dict[str, Any]]:
+        """Return the processed records of the stream from the API."""
+        yield from super().get_records(context)
+
+    def _request(
+        self, prepared_request: requests.PreparedRequest, context: Optional[dict]
+    ) -> requests.Response:
+        """Send the request, or record or replay it when `replay_mode` is set.
+
+        Every request sent, including the retries of `request_decorator`, counts
+        against the daily operations budget. Replayed requests do not.
+        """
+        replay_mode = self.config.get("replay_mode")
+        if replay_mode not in (RECORD_MODE, REPLAY_MODE):
+            self._record_operation(context)
+            return super()._request(prepared_request, context)
+
+        archive = ResponseArchive(
+            self.config.get("replay_archive_dir", "googleads_archive")
+        )
+        query = parse_qs(urlparse(prepared_request.url).query)
+        page_path = archive.page_path(
+            customer_id=(context or {}).get("client_id") or self.config["customer_id"],
+            stream_name=self.name,
+            query=getattr(self, "gaql", None) or self.path,
+            page_token=query.get("pageToken", [None])[0],
+        )
+        if replay_mode == REPLAY_MODE:
+            response = archive.load(page_path, prepared_request)
+            self.validate_response(response)
+            return response
+
+        self._record_operation(context)
+        response = super()._request(prepared_request, context)
+        archive.save(page_path, response)
+        return response
+
+    def _record_operation(self, context: Optional[dict] = None) -> None:
+        if self.quota_planner is None:
+            return
+        # Requests made on behalf of another stream's job, e.g. dimension loads
+        stream_name, customer_id = (context or {}).get(
+            "quota_job", (self.name, self._job_customer)
+        )
+        self.quota_planner.record_operation(stream_name, customer_id)
+
+    def response_json(self, response: requests.Response) -> dict:
+        """Return the decoded response body, decoding it only once per response."""
+        if not hasattr(response, "_decoded_json"):
+            response._decoded_json = response.json()  # type: ignore
+        return response._decoded_json  # type: ignore
+
+    def report_page(self, response: requests.Response) -> ReportPage:
+        """Return the report page of a response, created once per response."""
+        if not hasattr(response, "_report_page"):
+            # JSON responses are UTF-8, `response.text` would guess the encoding
+            text = response.content.decode("utf-8")
+            response._report_page = ReportPage(text)  # type: ignore
+        return response._report_page  # type: ignore
+
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Parse the response and return an iterator of result records.
+
+        Report pages hold up to 10,000 rows. Their rows are decoded one at a
+        time as they are read, instead of decoding the whole page up front.
+        """
+        if self.records_jsonpath != RESULTS_JSONPATH:
+            yield from extract_jsonpath(
+                self.records_jsonpath, input=self.response_json(response)
+            )
+            return
+        yield from self.report_page(response).rows()
+
     def get_next_page_token(
         self, response: requests.Response, previous_token: Optional[Any]
     ) -> Optional[Any]:
         """Return a token for identifying next page or None if no more pages."""
+        if self.records_jsonpath == RESULTS_JSONPATH:
+            return self.report_page(response).fields.get("nextPageToken")
         # TODO: If pagination is required, return a token which can be used to get the
         #       next page. If this is the final page, return "None" to end the
         #       pagination loop.
         if self.next_page_token_jsonpath:
             all_matches = extract_jsonpath(
-                self.next_page_token_jsonpath, response.json()
+                self.next_page_token_jsonpath, self.response_json(response)
             )
             first_match = next(iter(all_matches), None)
             next_page_token = first_match
@@ -117,17 +321,19 @@ class GoogleAdsStream(RESTStream):
         return params
 
     @property
-    def start_date(self):
+    def start_date(self) -> str:
+        """Return the quoted start date, a year ago by default."""
         date = self.config.get("start_date")
         if date:
-            date = parser.parse(self.config.get("start_date"))
-            date = "'" + date.strftime("%Y-%m-%d") + "'"
-        return date or self._start_date
+            start_date = parser.parse(date)
+        else:
+            # Computed on each call, a resident daemon must not keep its start day
+            start_date = datetime.now() - timedelta(days=DEFAULT_LOOKBACK_DAYS)
+        return "'" + start_date.strftime("%Y-%m-%d") + "'"
 
     @property
-    def end_date(self):
+    def end_date(self) -> str:
+        """Return the quoted end date, today by default."""
         date = self.config.get("end_date")
-        if date:
-            date = parser.parse(self.config.get("end_date"))
-            date = "'" + date.strftime("%Y-%m-%d") + "'"
-        return date or self._end_date
+        end_date = parser.parse(date) if date else datetime.now()
+        return "'" + end_date.strftime("%Y-%m-%d") + "'"
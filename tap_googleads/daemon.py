@@ -0,0 +1,147 @@
+"""Long-running tap-googleads server that runs sync jobs sent over HTTP.
+
+The process stays resident between jobs, so imports, HTTP connections and
+OAuth tokens are reused instead of being set up again for every sync. A job is
+the JSON body of a `POST /sync` request:
+
+    {"config": {...}, "catalog": {...}, "state": {...}}
+
+`catalog` and `state` are optional. The Singer messages of the sync are
+streamed back as a chunked response body, one message per line. When a sync
+fails the response ends without its last chunk, so clients see an incomplete
+response instead of a truncated success. Connections are served by separate
+threads, so an idle keep-alive connection never holds up other clients, but
+jobs still run one at a time, in the order they are received.
+
+Stream schemas and the discovered catalog are cached by the config fields
+discovery depends on (`grain` and `stream_grains`). Later jobs build their
+streams from the cached schemas instead of reading the schema files, and reuse
+the cached catalog. Streams hold the config and state of their job, so they are
+still built for each job.
+"""
+
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import BinaryIO, Optional
+
+import requests
+import singer
+
+from tap_googleads.discovery import DiscoveryCache
+from tap_googleads.tap import TapGoogleAds
+from tap_googleads.writer import BufferedMessageWriter, buffered_output
+
+LOGGER = singer.get_logger()
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class ChunkedResponse:
+    """Text output written to an HTTP response with chunked transfer encoding."""
+
+    def __init__(self, wfile: BinaryIO) -> None:
+        """Create a chunked response written to the `wfile` of a request."""
+        self.wfile = wfile
+
+    def write(self, text: str) -> None:
+        """Write text as one chunk, empty text is not written."""
+        data = text.encode("utf-8")
+        if data:
+            self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+
+    def flush(self) -> None:
+        """Send the chunks written so far."""
+        self.wfile.flush()
+
+    def close(self) -> None:
+        """End the response with its last, empty chunk."""
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class SyncJobHandler(BaseHTTPRequestHandler):
+    """Run the sync job posted to `/sync` and stream its messages back."""
+
+    protocol_version = "HTTP/1.1"
+    # Singer messages go through the module level singer.write_message
+    job_lock = threading.Lock()
+
+    def do_POST(self) -> None:
+        """Run the posted sync job, or reply with an error if it is invalid."""
+        if self.path != "/sync":
+            self.send_error(404)
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = json.loads(self.rfile.read(length))
+            # Messages are already buffered into the response by the daemon
+            config = dict(job["config"], buffered_output=False)
+        except (ValueError, KeyError, TypeError) as ex:
+            self.send_error(400, f"Invalid sync job: {ex}")
+            return
+
+        with self.job_lock:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            output = ChunkedResponse(self.wfile)
+            try:
+                tap = TapGoogleAds(
+                    config=config, catalog=job.get("catalog"), state=job.get("state")
+                )
+                with buffered_output(BufferedMessageWriter(output)):
+                    tap.sync_all()
+            except Exception:
+                LOGGER.exception("Sync job failed.")
+                self.close_connection = True
+                return
+            output.close()
+
+    def log_message(self, format: str, *args) -> None:
+        """Log requests with the tap's logger instead of stderr."""
+        LOGGER.info(f"{self.address_string()} {format % args}")
+
+
+class SyncJobServer(ThreadingMixIn, HTTPServer):
+    """HTTP server handling each connection in its own thread."""
+
+    daemon_threads = True
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    session: Optional[requests.Session] = None,
+) -> SyncJobServer:
+    """Return a server running sync jobs with one warm HTTP session and cache.
+
+    Args:
+        host: Interface to listen on, only local by default.
+        port: Port to listen on.
+        session: HTTP session shared by every job, created when not given.
+    """
+    TapGoogleAds.shared_session = session or requests.Session()
+    TapGoogleAds.discovery_cache = DiscoveryCache()
+    return SyncJobServer((host, port), SyncJobHandler)
+
+
+def main() -> None:
+    """Run the tap-googleads daemon until it is interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port)
+    LOGGER.info(f"Listening for sync jobs on http://{args.host}:{args.port}/sync")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
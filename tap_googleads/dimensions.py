@@ -0,0 +1,107 @@
+"""In-memory index of dimension attributes used to enrich fact records."""
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import singer
+
+if TYPE_CHECKING:
+    from tap_googleads.client import GoogleAdsStream
+
+LOGGER = singer.get_logger()
+
+# Dimension -> attributes kept in the index. A dimension is named after the
+# record property holding its `id` and attributes, e.g. record["campaign"].
+DIMENSION_ATTRIBUTES = {
+    "campaign": ("name",),
+    "adGroup": ("name",),
+}
+DEFAULT_MAX_ENTRIES = 1000000
+
+
+class DimensionIndex:
+    """Id to attributes index of dimensions, loaded once per customer and run.
+
+    Attributes are stored as tuples in one table per customer and dimension.
+    When the index holds more than `max_entries` entries, the least recently
+    loaded tables are dropped and loaded again if they are needed later.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        """Create a new dimension index.
+
+        Args:
+            max_entries: Number of entries kept in memory.
+        """
+        self.max_entries = max_entries
+        self.loaders: Dict[str, "GoogleAdsStream"] = {}
+        self._tables: "OrderedDict[Tuple[Optional[str], str], Dict[str, tuple]]" = (
+            OrderedDict()
+        )
+        self._size = 0
+
+    def _load(
+        self, customer_id: Optional[str], dimension: str, requested_by: Optional[str]
+    ) -> Dict[str, tuple]:
+        attributes = DIMENSION_ATTRIBUTES[dimension]
+        table = {}
+        context: dict = {"client_id": customer_id}
+        if requested_by is not None:
+            # The requests are counted against the job that needed the dimension
+            context["quota_job"] = (requested_by, customer_id)
+        records = self.loaders[dimension].request_records(context)
+        for record in records:
+            values = record.get(dimension, {})
+            table[values["id"]] = tuple(values.get(name) for name in attributes)
+
+        while self._tables and self._size + len(table) > self.max_entries:
+            _, evicted = self._tables.popitem(last=False)
+            self._size -= len(evicted)
+        if len(table) > self.max_entries:
+            LOGGER.warning(
+                f"{len(table)} {dimension} entries of customer {customer_id} "
+                f"exceed the dimension index size of {self.max_entries}."
+            )
+        self._tables[(customer_id, dimension)] = table
+        self._size += len(table)
+        return table
+
+    def lookup(
+        self,
+        customer_id: Optional[str],
+        dimension: str,
+        dimension_id: str,
+        requested_by: Optional[str] = None,
+    ) -> Optional[dict]:
+        """Return the attributes of a dimension, or None if it is unknown.
+
+        Args:
+            customer_id: Customer the dimension belongs to.
+            dimension: Dimension name, e.g. "campaign".
+            dimension_id: Id of the dimension.
+            requested_by: Stream whose job the API requests are counted against.
+        """
+        table = self._tables.get((customer_id, dimension))
+        if table is None:
+            table = self._load(customer_id, dimension, requested_by)
+        values = table.get(dimension_id)
+        if values is None:
+            return None
+        return dict(zip(DIMENSION_ATTRIBUTES[dimension], values))
+
+    def enrich(
+        self,
+        customer_id: Optional[str],
+        record: dict,
+        dimensions: List[str],
+        requested_by: Optional[str] = None,
+    ) -> dict:
+        """Add the indexed attributes of `dimensions` to `record`."""
+        for dimension in dimensions:
+            dimension_id = record.get(dimension, {}).get("id")
+            if dimension_id is None or dimension not in self.loaders:
+                continue
+            attributes = self.lookup(customer_id, dimension, dimension_id, requested_by)
+            if attributes:
+                record[dimension].update(attributes)
+        return record
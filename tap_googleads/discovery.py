@@ -0,0 +1,46 @@
+"""Cache of discovered stream schemas and catalogs."""
+
+import json
+from typing import Dict, Mapping, Optional
+
+from singer_sdk.helpers._singer import Catalog
+
+# Config fields discovery depends on, they change the date segment of reports
+DISCOVERY_CONFIG_KEYS = ("grain", "stream_grains")
+
+
+class DiscoveryCache:
+    """Stream schemas and catalogs discovered once and reused by later taps.
+
+    Entries are keyed by the config fields discovery depends on, so taps with
+    other credentials, customers or dates share them. Streams hold the config
+    and state of their tap, so each tap still builds its own streams, but from
+    the cached schemas instead of the schema files.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty discovery cache."""
+        self._schemas: Dict[str, Dict[str, dict]] = {}
+        self._catalogs: Dict[str, Catalog] = {}
+
+    @staticmethod
+    def key(config: Mapping) -> str:
+        """Return the cache key of a tap config."""
+        return json.dumps(
+            [config.get(name) for name in DISCOVERY_CONFIG_KEYS], sort_keys=True
+        )
+
+    def schemas(self, config: Mapping) -> Dict[str, dict]:
+        """Return the schemas by stream class discovered with this config.
+
+        The returned dict is filled in by the first tap discovering the streams.
+        """
+        return self._schemas.setdefault(self.key(config), {})
+
+    def catalog(self, config: Mapping) -> Optional[Catalog]:
+        """Return the catalog discovered with this config, if any."""
+        return self._catalogs.get(self.key(config))
+
+    def put_catalog(self, config: Mapping, catalog: Catalog) -> None:
+        """Cache the catalog discovered with this config."""
+        self._catalogs[self.key(config)] = catalog
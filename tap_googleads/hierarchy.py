@@ -0,0 +1,47 @@
+"""Cache of resolved customer hierarchies."""
+
+import json
+import time
+from pathlib import Path
+from typing import List, Optional
+
+SECONDS_PER_HOUR = 60 * 60
+
+
+class HierarchyCache:
+    """JSON file of the client accounts found under each root customer.
+
+    Entries expire `ttl_hours` after the hierarchy was resolved, after which
+    the hierarchy is traversed again.
+    """
+
+    def __init__(self, path: str, ttl_hours: float) -> None:
+        """Create a new hierarchy cache.
+
+        Args:
+            path: Location of the JSON cache file.
+            ttl_hours: Hours a resolved hierarchy is reused for.
+        """
+        self.path = Path(path)
+        self.ttl_hours = ttl_hours
+
+    def _read(self) -> dict:
+        if not self.path.exists():
+            return {}
+        return json.loads(self.path.read_text())
+
+    def get(self, customer_id: str) -> Optional[List[dict]]:
+        """Return the cached client rows of a customer, unless they expired."""
+        entry = self._read().get(customer_id)
+        if entry is None or entry["expires"] <= time.time():
+            return None
+        return entry["clients"]
+
+    def put(self, customer_id: str, clients: List[dict]) -> None:
+        """Cache the client rows of a customer."""
+        cache = self._read()
+        cache[customer_id] = {
+            "expires": time.time() + self.ttl_hours * SECONDS_PER_HOUR,
+            "clients": clients,
+        }
+        self.path.write_text(json.dumps(cache, indent=2, sort_keys=True))
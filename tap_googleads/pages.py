@@ -0,0 +1,95 @@
+"""Incremental decoding of Google Ads report pages."""
+
+import json
+import re
+from typing import Any, Dict, Iterator
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class ReportPage:
+    """Search response page whose `results` rows are decoded one at a time.
+
+    A page holds up to 10,000 rows, which take several times the size of the
+    response body once decoded. Rows are decoded from the body as they are
+    read, so only the rows still referenced downstream are kept in memory.
+    The other top level fields, e.g. `nextPageToken`, are small and are kept
+    in `fields` once the page has been read.
+    """
+
+    def __init__(self, text: str) -> None:
+        """Create a page read from the text of a response body.
+
+        Args:
+            text: The JSON response body.
+        """
+        self._text = text
+        self._pos = self._expect(self._skip(0), "{")
+        self._in_results = False
+        self._fields: Dict[str, Any] = {}
+
+    def _skip(self, pos: int) -> int:
+        return _WHITESPACE.match(self._text, pos).end()  # type: ignore[union-attr]
+
+    def _expect(self, pos: int, char: str) -> int:
+        if not self._text.startswith(char, pos):
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._text, pos)
+        return pos + 1
+
+    def _decode(self) -> Any:
+        value, pos = _DECODER.raw_decode(self._text, self._skip(self._pos))
+        self._pos = self._skip(pos)
+        return value
+
+    def _end_of_value(self, closing: str) -> bool:
+        """Consume the comma or bracket after a value, True if it was a comma."""
+        self._pos = self._skip(self._pos)
+        if self._text.startswith(",", self._pos):
+            self._pos += 1
+            return True
+        self._pos = self._expect(self._pos, closing)
+        if closing == "}":
+            # The whole page has been read, release its body
+            self._text = ""
+        return False
+
+    def _read_fields(self) -> None:
+        """Read the fields up to the next row, or to the end of the page."""
+        while self._text:
+            self._pos = self._skip(self._pos)
+            if self._text.startswith("}", self._pos):
+                self._text = ""
+                return
+            key = self._decode()
+            self._pos = self._skip(self._expect(self._pos, ":"))
+            if key == "results":
+                self._pos = self._skip(self._expect(self._pos, "["))
+                if not self._text.startswith("]", self._pos):
+                    self._in_results = True
+                    return
+                self._pos += 1
+            else:
+                self._fields[key] = self._decode()
+            if not self._end_of_value("}"):
+                return
+
+    def rows(self) -> Iterator[dict]:
+        """Yield the rows under `results` not read yet, decoding each on demand."""
+        while self._text:
+            if not self._in_results:
+                self._read_fields()
+                continue
+            row = self._decode()
+            if not self._end_of_value("]"):
+                self._in_results = False
+                if self._end_of_value("}"):
+                    self._read_fields()
+            yield row
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        """Return the top level fields besides `results`, reading the whole page."""
+        for _ in self.rows():
+            pass
+        return self._fields
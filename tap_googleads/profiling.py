@@ -0,0 +1,90 @@
+"""Per-stream profiling of tap runs."""
+
+import cProfile
+import io
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import singer
+
+LOGGER = singer.get_logger()
+
+
+class StreamProfiler:
+    """Collect a cProfile profile, and optionally memory statistics, per stream.
+
+    Child streams are synced from within their parent's sync, so the parent's
+    profile is paused while a child runs and each stream is profiled on its own.
+    Memory is reported as the allocations that grew during a stream's last sync,
+    which for a parent stream include those of its children.
+    """
+
+    def __init__(self, directory: str, top_n: int = 25, trace_memory: bool = False):
+        """Create a new stream profiler.
+
+        Args:
+            directory: Directory the profiles and summary are written to.
+            top_n: Number of functions and allocation sites reported per stream.
+            trace_memory: Whether to compare tracemalloc snapshots per stream.
+        """
+        self.directory = Path(directory)
+        self.top_n = top_n
+        self.trace_memory = trace_memory
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._memory_stats: Dict[str, List[tracemalloc.StatisticDiff]] = {}
+        self._active: List[str] = []
+
+    @contextmanager
+    def profile(self, stream_name: str) -> Iterator[None]:
+        """Profile the enclosed block under `stream_name`."""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        start = tracemalloc.take_snapshot() if self.trace_memory else None
+        if self._active:
+            self._profiles[self._active[-1]].disable()
+        profile = self._profiles.setdefault(stream_name, cProfile.Profile())
+        self._active.append(stream_name)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._active.pop()
+            if start is not None:
+                snapshot = tracemalloc.take_snapshot()
+                self._memory_stats[stream_name] = snapshot.compare_to(start, "lineno")[
+                    : self.top_n
+                ]
+            if self._active:
+                self._profiles[self._active[-1]].enable()
+
+    def write(self) -> None:
+        """Write `<stream>.prof` files and a hot function summary per stream."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        summary = io.StringIO()
+        summary.write(
+            "Profiles cover the thread syncing the streams only, requests sent by "
+            "the customer hierarchy worker threads are not included.\n\n"
+        )
+        for stream_name, profile in self._profiles.items():
+            profile.dump_stats(str(self.directory / f"{stream_name}.prof"))
+            summary.write(f"==== {stream_name} ====\n")
+            stats = pstats.Stats(profile, stream=summary)
+            stats.sort_stats("cumulative").print_stats(self.top_n)
+            if stream_name in self._memory_stats:
+                summary.write(
+                    f"Top {self.top_n} allocation sites grown during the last sync:\n"
+                )
+                for statistic in self._memory_stats[stream_name]:
+                    summary.write(f"{statistic}\n")
+                summary.write("\n")
+        summary_path = self.directory / "summary.txt"
+        summary_path.write_text(summary.getvalue())
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        LOGGER.info(
+            f"Wrote profiles of {len(self._profiles)} streams to {self.directory}."
+        )
@@ -0,0 +1,164 @@
+"""Daily API operations budget of the developer token."""
+
+import json
+import threading
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import singer
+from dateutil import tz
+
+LOGGER = singer.get_logger()
+
+# Google Ads resets the daily operations quota at midnight Pacific Time
+QUOTA_TIMEZONE = tz.gettz("America/Los_Angeles")
+# Weight of the latest run in the estimated operations of a stream
+ESTIMATE_SMOOTHING = 0.5
+DEFAULT_LEDGER_PATH = "googleads_quota.json"
+
+
+def quota_date() -> str:
+    """Return the date of the current quota day."""
+    return datetime.now(QUOTA_TIMEZONE).strftime("%Y-%m-%d")
+
+
+def job_key(stream_name: str, customer_id: Optional[str]) -> str:
+    """Return the ledger key of the sync of a stream for one customer."""
+    if customer_id is None:
+        return stream_name
+    return f"{customer_id}/{stream_name}"
+
+
+class QuotaPlanner:
+    """Track the operations used today and defer jobs that would exceed them.
+
+    A job is the sync of one stream for one customer. A local JSON ledger keeps
+    the operations used on the current quota day and, per job and per stream,
+    an estimate of the operations a sync takes, learnt from previous runs.
+
+    Child streams are synced customer by customer, so priorities are applied
+    across customers: once the pending jobs of the run are planned, a job is
+    only admitted if the budget left after it still covers every pending job of
+    a higher priority. When the budget runs low, the jobs deferred are the
+    least important ones of every customer.
+    """
+
+    def __init__(
+        self,
+        daily_budget: int,
+        ledger_path: str = DEFAULT_LEDGER_PATH,
+        priorities: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Create a new quota planner.
+
+        Args:
+            daily_budget: Operations the developer token may use per day.
+            ledger_path: Location of the JSON ledger.
+            priorities: Stream priorities, higher is synced first, defaults to 0.
+        """
+        self.daily_budget = daily_budget
+        self.ledger_path = Path(ledger_path)
+        self.priorities = priorities or {}
+        self.date = quota_date()
+        self.used = 0
+        # Estimated operations per stream, used for jobs without history
+        self.estimates: Dict[str, float] = {}
+        # Estimated operations per job key
+        self.job_estimates: Dict[str, float] = {}
+        if self.ledger_path.exists():
+            ledger = json.loads(self.ledger_path.read_text())
+            self.estimates = ledger.get("estimates", {})
+            self.job_estimates = ledger.get("job_estimates", {})
+            if ledger.get("date") == self.date:
+                self.used = ledger.get("operations", 0)
+        self._pending: Set[Tuple[str, Optional[str]]] = set()
+        self._run_operations: Dict[Tuple[str, Optional[str]], int] = defaultdict(int)
+        self._run_jobs: Dict[Tuple[str, Optional[str]], int] = defaultdict(int)
+        # Streams may send requests from several threads at once
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        """Return the operations left in today's budget."""
+        return self.daily_budget - self.used
+
+    def priority(self, stream_name: str) -> int:
+        """Return the configured priority of a stream."""
+        return self.priorities.get(stream_name, 0)
+
+    def estimate(self, stream_name: str, customer_id: Optional[str] = None) -> float:
+        """Return the estimated operations of one sync of a stream."""
+        key = job_key(stream_name, customer_id)
+        if key in self.job_estimates:
+            return self.job_estimates[key]
+        return self.estimates.get(stream_name, 1.0)
+
+    def plan(self, jobs: Iterable[Tuple[str, Optional[str]]]) -> None:
+        """Add `(stream name, customer id)` jobs that will be synced this run."""
+        with self._lock:
+            self._pending.update(jobs)
+
+    def reserved(self, stream_name: str) -> float:
+        """Return the operations held back for pending higher priority jobs."""
+        priority = self.priority(stream_name)
+        return sum(
+            self.estimate(*job)
+            for job in self._pending
+            if self.priority(job[0]) > priority
+        )
+
+    def admit(self, stream_name: str, customer_id: Optional[str] = None) -> bool:
+        """Return whether a job fits in the budget left for its priority."""
+        with self._lock:
+            self._pending.discard((stream_name, customer_id))
+            available = self.remaining - self.reserved(stream_name)
+            if self.estimate(stream_name, customer_id) > available:
+                return False
+            self._run_jobs[(stream_name, customer_id)] += 1
+            return True
+
+    def record_operation(
+        self, stream_name: str, customer_id: Optional[str] = None
+    ) -> None:
+        """Count an API operation made by a job."""
+        with self._lock:
+            if quota_date() != self.date:
+                self.date = quota_date()
+                self.used = 0
+            self.used += 1
+            self._run_operations[(stream_name, customer_id)] += 1
+
+    def close(self) -> None:
+        """Update the job and stream estimates with this run and write the ledger."""
+        stream_operations: Dict[str, int] = defaultdict(int)
+        stream_jobs: Dict[str, int] = defaultdict(int)
+        for job, jobs in self._run_jobs.items():
+            operations = self._run_operations[job]
+            key = job_key(*job)
+            self.job_estimates[key] = self._smooth(
+                self.job_estimates.get(key), operations / jobs
+            )
+            stream_operations[job[0]] += operations
+            stream_jobs[job[0]] += jobs
+        for stream_name, jobs in stream_jobs.items():
+            self.estimates[stream_name] = self._smooth(
+                self.estimates.get(stream_name), stream_operations[stream_name] / jobs
+            )
+        ledger = {
+            "date": self.date,
+            "operations": self.used,
+            "estimates": self.estimates,
+            "job_estimates": self.job_estimates,
+        }
+        self.ledger_path.write_text(json.dumps(ledger, indent=2, sort_keys=True))
+        LOGGER.info(
+            f"Used {self.used} of {self.daily_budget} API operations on {self.date}."
+        )
+
+    @staticmethod
+    def _smooth(previous: Optional[float], operations: float) -> float:
+        if previous is None:
+            return operations
+        return ESTIMATE_SMOOTHING * operations + (1 - ESTIMATE_SMOOTHING) * previous
@@ -0,0 +1,134 @@
+"""Content-hash index used to suppress records unchanged since a previous run."""
+
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Any, Optional
+
+import singer
+
+LOGGER = singer.get_logger()
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def _digest(value: Any) -> bytes:
+    """Return a compact, stable hash of a JSON serializable value."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).digest()
+
+
+class RecordIndex:
+    """SQLite index of record hashes keyed by stream and record key.
+
+    Changes are only committed by `close()`, at the end of a successful run, so
+    records suppressed in a failed run are emitted again on the next one.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: Optional[int] = None,
+        max_age_days: Optional[int] = None,
+    ) -> None:
+        """Create a new record index.
+
+        Args:
+            path: Location of the SQLite database file.
+            max_entries: Number of entries kept when pruning, oldest go first.
+            max_age_days: Entries not seen for this many days are pruned.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.run_started = int(time.time())
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Return the index database connection, creating the table if needed."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS record_hashes (
+                    stream TEXT NOT NULL,
+                    record_key BLOB NOT NULL,
+                    record_hash BLOB NOT NULL,
+                    last_seen INTEGER NOT NULL,
+                    PRIMARY KEY (stream, record_key)
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS record_hashes_last_seen "
+                "ON record_hashes (last_seen)"
+            )
+        return self._connection
+
+    def is_changed(self, stream_name: str, record_key: Any, record: dict) -> bool:
+        """Store the hash of `record` and return whether it is new or changed.
+
+        Args:
+            stream_name: Name of the stream the record belongs to.
+            record_key: JSON serializable value identifying the record.
+            record: The record about to be emitted.
+
+        Returns:
+            False if the same record was already indexed under `record_key`.
+        """
+        key = _digest(record_key)
+        record_hash = _digest(record)
+        row = self.connection.execute(
+            "SELECT record_hash FROM record_hashes "
+            "WHERE stream = ? AND record_key = ?",
+            (stream_name, key),
+        ).fetchone()
+        if row is None:
+            self.connection.execute(
+                "INSERT INTO record_hashes VALUES (?, ?, ?, ?)",
+                (stream_name, key, record_hash, self.run_started),
+            )
+            return True
+        self.connection.execute(
+            "UPDATE record_hashes SET record_hash = ?, last_seen = ? "
+            "WHERE stream = ? AND record_key = ?",
+            (record_hash, self.run_started, stream_name, key),
+        )
+        return bytes(row[0]) != record_hash
+
+    def prune(self) -> int:
+        """Remove expired entries and keep at most `max_entries`.
+
+        Returns:
+            The number of entries removed.
+        """
+        removed = 0
+        if self.max_age_days is not None:
+            expired_before = self.run_started - self.max_age_days * SECONDS_PER_DAY
+            removed += self.connection.execute(
+                "DELETE FROM record_hashes WHERE last_seen < ?", (expired_before,)
+            ).rowcount
+        if self.max_entries is not None:
+            (count,) = self.connection.execute(
+                "SELECT COUNT(*) FROM record_hashes"
+            ).fetchone()
+            if count > self.max_entries:
+                removed += self.connection.execute(
+                    "DELETE FROM record_hashes WHERE rowid IN ("
+                    "SELECT rowid FROM record_hashes ORDER BY last_seen LIMIT ?)",
+                    (count - self.max_entries,),
+                ).rowcount
+        return removed
+
+    def close(self) -> None:
+        """Prune and commit the index, then close the database connection."""
+        if self._connection is None:
+            return
+        removed = self.prune()
+        if removed:
+            LOGGER.info(f"Pruned {removed} entries from record index {self.path}.")
+        self._connection.commit()
+        self._connection.close()
+        self._connection = None
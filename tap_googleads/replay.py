@@ -0,0 +1,74 @@
+"""Local archive of raw API response pages, used to record and replay runs."""
+
+import gzip
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+RECORD_MODE = "record"
+REPLAY_MODE = "replay"
+
+
+def _short_hash(value: str) -> str:
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class ResponseArchive:
+    """Gzip compressed response pages keyed by customer, stream, query and page.
+
+    Pages are stored as `<customer>/<stream>/<query hash>/<page>.json.gz` where
+    the first page is `0` and later pages are named after a hash of their token.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Create a new response archive.
+
+        Args:
+            directory: Root directory of the archive.
+        """
+        self.directory = Path(directory)
+
+    def page_path(
+        self,
+        customer_id: str,
+        stream_name: str,
+        query: str,
+        page_token: Optional[str],
+    ) -> Path:
+        """Return the archive file of a response page."""
+        page = _short_hash(page_token) if page_token else "0"
+        return (
+            self.directory
+            / str(customer_id)
+            / stream_name
+            / _short_hash(query)
+            / f"{page}.json.gz"
+        )
+
+    def save(self, page_path: Path, response: requests.Response) -> None:
+        """Write the body of a response page to the archive."""
+        page_path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(page_path, "wb") as page_file:
+            page_file.write(response.content)
+
+    def load(
+        self, page_path: Path, prepared_request: requests.PreparedRequest
+    ) -> requests.Response:
+        """Return a response page read from the archive.
+
+        Raises:
+            RuntimeError: When the page was not recorded.
+        """
+        if not page_path.exists():
+            raise RuntimeError(
+                f"No recorded response for {prepared_request.url} in {page_path}."
+            )
+        response = requests.Response()
+        with gzip.open(page_path, "rb") as page_file:
+            response._content = page_file.read()
+        response.status_code = 200
+        response.url = prepared_request.url or ""
+        response.request = prepared_request
+        return response
@@ -1,15 +1,35 @@
 """Stream type classes for tap-googleads."""
 
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, Optional, Union, List, Iterable
 
+from dateutil.relativedelta import relativedelta
 from singer_sdk import typing as th  # JSON Schema typing helpers
 
 from tap_googleads.client import GoogleAdsStream
 from tap_googleads.auth import GoogleAdsAuthenticator
+from tap_googleads.hierarchy import HierarchyCache
 
 # TODO: Delete this is if not using json files for schema definition
 SCHEMAS_DIR = Path(__file__).parent / Path("./schemas")
+
+# Reporting grain -> GAQL date segment (also the response field name)
+GRAIN_SEGMENTS = {
+    "day": "date",
+    "week": "week",
+    "month": "month",
+    "quarter": "quarter",
+}
+DEFAULT_GRAIN = "day"
+# Length of the periods of each grain, weeks start on Monday in Google Ads
+GRAIN_PERIODS = {
+    "week": relativedelta(weeks=1),
+    "month": relativedelta(months=1),
+    "quarter": relativedelta(months=3),
+}
 # TODO: - Override `UsersStream` and `GroupsStream` with your own stream definition.
 #       - Copy-paste as many times as needed to create multiple stream types.
 
@@ -103,9 +123,61 @@ class CustomerHierarchyStream(GoogleAdsStream):
         )
     ).to_dict()
 
+    @property
+    def hierarchy_cache(self) -> Optional[HierarchyCache]:
+        """Return the cache of resolved hierarchies, if configured."""
+        path = self.config.get("hierarchy_cache_path")
+        ttl_hours = self.config.get("hierarchy_cache_ttl_hours")
+        if path and ttl_hours:
+            return HierarchyCache(path, ttl_hours)
+        return None
+
+    def _query_manager(self, manager_id: str) -> List[dict]:
+        """Return the manager itself and its direct clients."""
+        try:
+            return list(self.request_records({"client_id": manager_id}))
+        except Exception:
+            # Sub-managers that cannot be accessed are left out of the hierarchy
+            breaker = self.customer_breaker
+            if breaker is not None and breaker.is_open(manager_id):
+                return []
+            raise
+
+    def resolve_hierarchy(self, customer_id: str) -> List[dict]:
+        """Return the client accounts under `customer_id`, at any depth.
+
+        The hierarchy is walked breadth first, querying the sub-managers of each
+        level in parallel. Clients reachable through several managers are only
+        returned once, with their `level` relative to `customer_id`.
+        """
+        clients: Dict[str, dict] = {}
+        visited = {customer_id}
+        frontier = [(customer_id, 0)]
+        max_workers = self.config.get("hierarchy_max_workers", 8)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while frontier:
+                results = executor.map(
+                    self._query_manager, [manager_id for manager_id, _ in frontier]
+                )
+                next_frontier = []
+                for (_, depth), rows in zip(frontier, results):
+                    for row in rows:
+                        client = row["customerClient"]
+                        client_id = client["id"]
+                        level = depth + int(client.get("level", 0))
+                        if client.get("manager"):
+                            if client_id not in visited:
+                                visited.add(client_id)
+                                next_frontier.append((client_id, level))
+                        elif client_id not in clients:
+                            client["level"] = str(level)
+                            clients[client_id] = row
+                frontier = next_frontier
+        return list(clients.values())
+
     # Goal of this stream is to send to children stream a dict of
     # login-customer-id:customer-id to query for all queries downstream
-    def get_records(self, context: Optional[dict]) -> Iterable[Dict[str, Any]]:
+    def read_records(self, context: Optional[dict]) -> Iterable[Dict[str, Any]]:
         """Return a generator of row-type dictionary objects.
 
         Each row emitted should be a dictionary of property names to their values.
@@ -118,22 +190,42 @@ class CustomerHierarchyStream(GoogleAdsStream):
         """
 
         context["client_id"] = self.config.get("customer_id")
-        for row in self.request_records(context):
-            row = self.post_process(row, context)
-            # Don't search Manager accounts as we can't query them for everything
-            if row["customerClient"]["manager"] == True:
-                continue
-            yield row
+        cache = self.hierarchy_cache
+        rows = cache.get(context["client_id"]) if cache else None
+        if rows is None:
+            # Manager accounts are left out as we can't query them for everything
+            rows = self.resolve_hierarchy(context["client_id"])
+            if cache:
+                cache.put(context["client_id"], rows)
+        if self.quota_planner is not None:
+            # Jobs of every client are planned up front, so that priorities
+            # hold across clients and not only between the streams of one
+            self.quota_planner.plan(
+                (child_stream.name, row["customerClient"]["id"])
+                for row in rows
+                for child_stream in self.child_streams
+                if child_stream.selected or child_stream.has_selected_descendents
+            )
+        for row in rows:
+            yield self.post_process(row, context)
 
     def get_child_context(self, record: dict, context: Optional[dict]) -> dict:
         """Return a context dictionary for child streams."""
-        return {"client_id": self.config.get("customer_id")}
+        return {"client_id": record["customerClient"]["id"]}
 
 
 class ReportsStream(GoogleAdsStream):
     rest_method = "POST"
     parent_stream_type = CustomerHierarchyStream
 
+    # Dotted paths identifying a record in the record index. When unset, every
+    # property but `metrics` is used.
+    record_key_properties: Optional[List[str]] = None
+    # Dimension this stream loads into the dimension index, e.g. "campaign"
+    dimension: Optional[str] = None
+    # Dimensions whose attributes are added to records from the dimension index
+    enrich_dimensions: List[str] = []
+
     @property
     def gaql(self):
         raise NotImplementedError
@@ -147,6 +239,101 @@ class ReportsStream(GoogleAdsStream):
         path = path + f"&query={self.gaql}"
         return path
 
+    def record_key(self, record: dict, context: Optional[dict]) -> list:
+        """Return the value identifying `record` in the record index."""
+        client_id = (context or {}).get("client_id")
+        if self.record_key_properties is None:
+            return [client_id, {k: v for k, v in record.items() if k != "metrics"}]
+        key = [client_id]
+        for dotted_path in self.record_key_properties:
+            value: Any = record
+            for part in dotted_path.split("."):
+                value = (value or {}).get(part)
+            key.append(value)
+        return key
+
+    def post_process(self, row: dict, context: Optional[dict] = None) -> Optional[dict]:
+        """Enrich rows, then drop rows unchanged since the last run."""
+        if self.dimension_index is not None and self.enrich_dimensions:
+            client_id = (context or {}).get("client_id")
+            self.dimension_index.enrich(
+                client_id, row, self.enrich_dimensions, requested_by=self.name
+            )
+        if self.record_index is None:
+            return row
+        record_key = self.record_key(row, context)
+        if not self.record_index.is_changed(self.name, record_key, row):
+            return None
+        return row
+
+
+class DateSegmentedReportsStream(ReportsStream):
+    """Report stream segmented by date, at a configurable reporting grain.
+
+    The grain is pushed down to GAQL so Google aggregates the rows server side.
+    It is read from `stream_grains.<stream name>`, falling back to `grain`.
+    The date range is widened to whole periods of the grain, so the first and
+    last rows are not aggregated over part of a week, month or quarter.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._schema = self._apply_grain_to_schema(self._schema)
+
+    @property
+    def grain(self) -> str:
+        """Return the reporting grain configured for this stream."""
+        grain = self.config.get("stream_grains", {}).get(self.name)
+        grain = grain or self.config.get("grain") or DEFAULT_GRAIN
+        if grain not in GRAIN_SEGMENTS:
+            raise ValueError(
+                f"Unsupported grain '{grain}' for stream '{self.name}', "
+                f"expected one of {list(GRAIN_SEGMENTS)}."
+            )
+        return grain
+
+    @property
+    def date_segment(self) -> str:
+        """Return the GAQL segment selected for the configured grain."""
+        return "segments." + GRAIN_SEGMENTS[self.grain]
+
+    def period_start(self, date: datetime) -> datetime:
+        """Return the first day of the grain period `date` falls in."""
+        if self.grain == "week":
+            return date - timedelta(days=date.weekday())
+        if self.grain == "month":
+            return date.replace(day=1)
+        if self.grain == "quarter":
+            return date.replace(month=(date.month - 1) // 3 * 3 + 1, day=1)
+        return date
+
+    def _snap_date(self, quoted_date: str, period_end: bool) -> str:
+        if self.grain not in GRAIN_PERIODS:
+            return quoted_date
+        date = self.period_start(datetime.strptime(quoted_date.strip("'"), "%Y-%m-%d"))
+        if period_end:
+            date = date + GRAIN_PERIODS[self.grain] - timedelta(days=1)
+        return "'" + date.strftime("%Y-%m-%d") + "'"
+
+    @property
+    def start_date(self):
+        return self._snap_date(super().start_date, period_end=False)
+
+    @property
+    def end_date(self):
+        return self._snap_date(super().end_date, period_end=True)
+
+    def _apply_grain_to_schema(self, schema: dict) -> dict:
+        """Replace the `segments.date` property with the configured grain."""
+        segment = GRAIN_SEGMENTS[self.grain]
+        # Schemas cached by the daemon already have the grain applied
+        if segment in schema["properties"]["segments"]["properties"]:
+            return schema
+        schema = copy.deepcopy(schema)
+        segments = schema["properties"]["segments"]["properties"]
+        segments[segment] = segments.pop("date")
+        return schema
+
 
 class CampaignsStream(ReportsStream):
     """Define custom stream."""
@@ -177,17 +364,18 @@ class CampaignsStream(ReportsStream):
     name = "stream_campaign"
     primary_keys = []
     replication_key = None
+    record_key_properties = ["campaign.id"]
+    dimension = "campaign"
     schema_filepath = SCHEMAS_DIR / "campaign.json"
 
 
-
 class AdGroupAssetStream(ReportsStream):
     """Define custom stream."""
 
     @property
     def gaql(self):
-        #add ad group id seperated from ad_group
-        #add ad group name (ad_group.name)
+        # add ad group id seperated from ad_group
+        # add ad group name (ad_group.name)
         return """
         SELECT 
         ad_group.id, 
@@ -202,6 +390,8 @@ class AdGroupAssetStream(ReportsStream):
     name = "stream_adgroups"
     primary_keys = []
     replication_key = None
+    record_key_properties = ["adGroup.id"]
+    dimension = "adGroup"
     schema_filepath = SCHEMAS_DIR / "ad_group.json"
 
 
@@ -223,19 +413,18 @@ class AdStream(ReportsStream):
     name = "stream_ads"
     primary_keys = []
     replication_key = None
+    record_key_properties = ["adGroupAd.ad.id"]
     schema_filepath = SCHEMAS_DIR / "ad.json"
 
 
-
-
-class PerformanceStreamKeyword(ReportsStream):
+class PerformanceStreamKeyword(DateSegmentedReportsStream):
     """PerformanceStreamKeyword"""
 
     @property
     def gaql(self):
         return f"""
     SELECT 
-    segments.date, 
+    {self.date_segment}, 
     ad_group_criterion.criterion_id, 
     campaign.id, 
     ad_group.id, 
@@ -270,15 +459,14 @@ class PerformanceStreamKeyword(ReportsStream):
     schema_filepath = SCHEMAS_DIR / "performance_keyword.json"
 
 
-
-class PerformanceStreamAd(ReportsStream):
+class PerformanceStreamAd(DateSegmentedReportsStream):
     """PerformanceStreamAd"""
 
     @property
     def gaql(self):
         return f"""
     SELECT 
-    segments.date, 
+    {self.date_segment}, 
     segments.ad_network_type,
     ad_group_ad.ad.id,
     campaign.id, 
@@ -310,7 +498,6 @@ class PerformanceStreamAd(ReportsStream):
     schema_filepath = SCHEMAS_DIR / "performance_ad.json"
 
 
-
 class KeywordViewStream(ReportsStream):
     """Keyword View Stream"""
 
@@ -329,19 +516,18 @@ class KeywordViewStream(ReportsStream):
     name = "stream_keyword_view"
     primary_keys = []
     replication_key = None
+    record_key_properties = ["adGroup.id", "adGroupCriterion.criterionId"]
     schema_filepath = SCHEMAS_DIR / "keyword.json"
 
 
-
-
-class GeographicStream(ReportsStream):
+class GeographicStream(DateSegmentedReportsStream):
     """Geographic View Stream"""
 
     @property
     def gaql(self):
         return f"""
     SELECT 
-    segments.date, 
+    {self.date_segment}, 
     campaign.id, 
     ad_group.id, 
     geographic_view.country_criterion_id, 
@@ -366,8 +552,7 @@ class GeographicStream(ReportsStream):
     schema_filepath = SCHEMAS_DIR / "geo.json"
 
 
-
-class ExtensionsStream(ReportsStream):
+class ExtensionsStream(DateSegmentedReportsStream):
     """Geographic View Stream"""
 
     @property
@@ -377,7 +562,7 @@ class ExtensionsStream(ReportsStream):
     extension_feed_item.extension_type, 
     ad_group.id, 
     campaign.id, 
-    segments.date, 
+    {self.date_segment}, 
     metrics.all_conversions, 
     metrics.clicks, 
     metrics.conversions, 
@@ -397,17 +582,17 @@ class ExtensionsStream(ReportsStream):
     schema_filepath = SCHEMAS_DIR / "extensions.json"
 
 
-class ConversionStream(ReportsStream):
-    """Geographic View Stream"""
+class ConversionStream(DateSegmentedReportsStream):
+    """Conversions Stream"""
 
     @property
     def gaql(self):
         return f"""
     SELECT 
     segments.conversion_action, 
-    segments.date, 
-    campaign.name, 
-    ad_group.name, 
+    {self.date_segment}, 
+    campaign.id, 
+    ad_group.id, 
     metrics.all_conversions, 
     metrics.all_conversions_value, 
     metrics.conversions, 
@@ -420,4 +605,5 @@ class ConversionStream(ReportsStream):
     name = "stream_conversions"
     primary_keys = []
     replication_key = None
-    schema_filepath = SCHEMAS_DIR / "conversions.json"
\ No newline at end of file
+    enrich_dimensions = ["campaign", "adGroup"]
+    schema_filepath = SCHEMAS_DIR / "conversions.json"
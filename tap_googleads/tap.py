@@ -1,9 +1,13 @@
 """GoogleAds tap class."""
 
-from typing import List
+from contextlib import ExitStack, contextmanager
+from typing import Iterator, List, Optional
+
+import requests
 
 from singer_sdk import Tap, Stream
 from singer_sdk import typing as th  # JSON schema typing helpers
+from singer_sdk.helpers._singer import Catalog
 
 from tap_googleads.streams import (
     CustomerStream,
@@ -16,7 +20,20 @@ from tap_googleads.streams import (
     AdStream,
     KeywordViewStream,
     GeographicStream,
-    ExtensionsStream
+    ExtensionsStream,
+    ConversionStream,
+)
+from tap_googleads.breaker import CustomerCircuitBreaker
+from tap_googleads.dimensions import DEFAULT_MAX_ENTRIES, DimensionIndex
+from tap_googleads.discovery import DiscoveryCache
+from tap_googleads.profiling import StreamProfiler
+from tap_googleads.quota import DEFAULT_LEDGER_PATH, QuotaPlanner
+from tap_googleads.record_index import RecordIndex
+from tap_googleads.writer import (
+    DEFAULT_BUFFER_SIZE,
+    DEFAULT_FLUSH_INTERVAL,
+    BufferedMessageWriter,
+    buffered_output,
 )
 
 STREAM_TYPES = [
@@ -30,7 +47,8 @@ STREAM_TYPES = [
     AdStream,
     KeywordViewStream,
     GeographicStream,
-    ExtensionsStream
+    ExtensionsStream,
+    ConversionStream,
 ]
 
 
@@ -61,8 +79,276 @@ class TapGoogleAds(Tap):
             "customer_id",
             th.StringType,
         ),
+        th.Property(
+            "grain",
+            th.StringType,
+            description="Reporting grain of date segmented streams: "
+            "day, week, month or quarter.",
+        ),
+        th.Property(
+            "stream_grains",
+            th.ObjectType(),
+            description="Per-stream reporting grain, keyed by stream name.",
+        ),
+        th.Property(
+            "record_index_path",
+            th.StringType,
+            description="SQLite file used to skip records unchanged since the "
+            "last run. Disabled when unset.",
+        ),
+        th.Property(
+            "record_index_max_entries",
+            th.IntegerType,
+            description="Maximum number of entries kept in the record index.",
+        ),
+        th.Property(
+            "record_index_max_age_days",
+            th.IntegerType,
+            description="Record index entries not seen for this many days are "
+            "pruned.",
+        ),
+        th.Property(
+            "replay_mode",
+            th.StringType,
+            description="'record' to archive raw API response pages, 'replay' "
+            "to run from the archive without calling the API.",
+        ),
+        th.Property(
+            "replay_archive_dir",
+            th.StringType,
+            description="Directory of the response archive, defaults to "
+            "'googleads_archive'.",
+        ),
+        th.Property(
+            "profile_dir",
+            th.StringType,
+            description="Profile each stream and write the profiles and a hot "
+            "function summary to this directory. Disabled when unset.",
+        ),
+        th.Property(
+            "profile_top_n",
+            th.IntegerType,
+            description="Number of hot functions reported per stream, defaults "
+            "to 25.",
+        ),
+        th.Property(
+            "profile_memory",
+            th.BooleanType,
+            description="Also report the top allocation sites of each stream.",
+        ),
+        th.Property(
+            "enrich_dimensions",
+            th.BooleanType,
+            description="Add campaign and ad group names to fact records from an "
+            "in-memory index instead of selecting them on every row, defaults "
+            "to true.",
+        ),
+        th.Property(
+            "dimension_index_max_entries",
+            th.IntegerType,
+            description="Maximum number of dimensions kept in memory for "
+            f"enrichment, defaults to {DEFAULT_MAX_ENTRIES}.",
+        ),
+        th.Property(
+            "buffered_output",
+            th.BooleanType,
+            description="Write Singer messages in large buffered writes, encoded "
+            "with orjson when it is installed.",
+        ),
+        th.Property(
+            "output_buffer_size",
+            th.IntegerType,
+            description="Buffered characters that trigger a write, defaults to "
+            f"{DEFAULT_BUFFER_SIZE}.",
+        ),
+        th.Property(
+            "output_flush_interval",
+            th.NumberType,
+            description="Seconds after which buffered messages are written, "
+            f"defaults to {DEFAULT_FLUSH_INTERVAL}.",
+        ),
+        th.Property(
+            "daily_operations_budget",
+            th.IntegerType,
+            description="API operations the developer token may use per day. "
+            "Streams that would exceed it are deferred. Disabled when unset.",
+        ),
+        th.Property(
+            "quota_ledger_path",
+            th.StringType,
+            description="JSON file tracking the operations used today, defaults "
+            f"to '{DEFAULT_LEDGER_PATH}'.",
+        ),
+        th.Property(
+            "stream_priorities",
+            th.ObjectType(),
+            description="Priority per stream name, higher priority streams are "
+            "synced first. Defaults to 0.",
+        ),
+        th.Property(
+            "inaccessible_customers_path",
+            th.StringType,
+            description="JSON file the customers that could not be accessed are "
+            "saved to, so later runs skip them too.",
+        ),
+        th.Property(
+            "inaccessible_customers_ttl_hours",
+            th.NumberType,
+            description="Hours later runs skip a saved inaccessible customer for, "
+            "defaults to 24.",
+        ),
+        th.Property(
+            "hierarchy_max_workers",
+            th.IntegerType,
+            description="Managers of the customer hierarchy queried in parallel, "
+            "defaults to 8.",
+        ),
+        th.Property(
+            "hierarchy_cache_path",
+            th.StringType,
+            description="JSON file the resolved customer hierarchy is cached in.",
+        ),
+        th.Property(
+            "hierarchy_cache_ttl_hours",
+            th.NumberType,
+            description="Hours a cached customer hierarchy is reused for.",
+        ),
     ).to_dict()
 
+    # HTTP session shared by the streams, set by the daemon to keep connections warm
+    shared_session: Optional[requests.Session] = None
+    # Schemas and catalogs reused by the taps of the daemon, set by the daemon
+    discovery_cache: Optional[DiscoveryCache] = None
+    _record_index: Optional[RecordIndex] = None
+    _profiler: Optional[StreamProfiler] = None
+    _dimension_index: Optional[DimensionIndex] = None
+    _quota_planner: Optional[QuotaPlanner] = None
+    _customer_breaker: Optional[CustomerCircuitBreaker] = None
+
+    @property
+    def record_index(self) -> Optional[RecordIndex]:
+        """Return the record index shared by all streams, if configured."""
+        if self._record_index is None and self.config.get("record_index_path"):
+            self._record_index = RecordIndex(
+                self.config["record_index_path"],
+                max_entries=self.config.get("record_index_max_entries"),
+                max_age_days=self.config.get("record_index_max_age_days"),
+            )
+        return self._record_index
+
+    @property
+    def profiler(self) -> Optional[StreamProfiler]:
+        """Return the profiler shared by all streams, if configured."""
+        if self._profiler is None and self.config.get("profile_dir"):
+            self._profiler = StreamProfiler(
+                self.config["profile_dir"],
+                top_n=self.config.get("profile_top_n", 25),
+                trace_memory=self.config.get("profile_memory", False),
+            )
+        return self._profiler
+
+    @property
+    def dimension_index(self) -> Optional[DimensionIndex]:
+        """Return the dimension index used to enrich fact records, if enabled."""
+        if self._dimension_index is None and self.config.get("enrich_dimensions", True):
+            self._dimension_index = DimensionIndex(
+                self.config.get("dimension_index_max_entries", DEFAULT_MAX_ENTRIES)
+            )
+        return self._dimension_index
+
+    @property
+    def quota_planner(self) -> Optional[QuotaPlanner]:
+        """Return the daily API operations planner, if a budget is configured."""
+        if self._quota_planner is None and self.config.get("daily_operations_budget"):
+            self._quota_planner = QuotaPlanner(
+                self.config["daily_operations_budget"],
+                ledger_path=self.config.get("quota_ledger_path", DEFAULT_LEDGER_PATH),
+                priorities=self.config.get("stream_priorities"),
+            )
+        return self._quota_planner
+
+    @property
+    def customer_breaker(self) -> CustomerCircuitBreaker:
+        """Return the circuit breaker of inaccessible customers."""
+        if self._customer_breaker is None:
+            self._customer_breaker = CustomerCircuitBreaker(
+                self.config.get("inaccessible_customers_path"),
+                ttl_hours=self.config.get("inaccessible_customers_ttl_hours"),
+            )
+        return self._customer_breaker
+
     def discover_streams(self) -> List[Stream]:
         """Return a list of discovered streams."""
-        return [stream_class(tap=self) for stream_class in STREAM_TYPES]
+        schemas = {}
+        if self.discovery_cache is not None:
+            schemas = self.discovery_cache.schemas(self.config)
+        streams = [
+            stream_class(tap=self, schema=schemas.get(stream_class.__name__))
+            for stream_class in STREAM_TYPES
+        ]
+        for stream in streams:
+            schemas[type(stream).__name__] = stream.schema
+            stream.record_index = self.record_index
+            stream.profiler = self.profiler
+            stream.dimension_index = self.dimension_index
+            if self.dimension_index is not None and getattr(stream, "dimension", None):
+                self.dimension_index.loaders[stream.dimension] = stream
+            stream.quota_planner = self.quota_planner
+            stream.customer_breaker = self.customer_breaker
+            stream.shared_session = self.shared_session
+        quota_planner = self.quota_planner
+        if quota_planner is not None:
+            # Child streams are synced in this order, so important ones go first
+            priority = quota_planner.priority
+            streams.sort(key=lambda stream: -priority(stream.name))
+        return streams
+
+    @property
+    def _singer_catalog(self) -> Catalog:
+        """Return the discovered catalog, cached by the daemon between jobs."""
+        if self.discovery_cache is None:
+            return super()._singer_catalog
+        catalog = self.discovery_cache.catalog(self.config)
+        if catalog is None:
+            catalog = super()._singer_catalog
+            self.discovery_cache.put_catalog(self.config, catalog)
+        return catalog
+
+    # Tap.sync_all is final, but the SDK has no hook around a whole run. The
+    # override only wraps the SDK's sync in `run_lifecycle`, which owns every
+    # resource the tap sets up for a run and finalises them.
+    def sync_all(self) -> None:  # type: ignore[misc]
+        """Sync all streams within the run lifecycle of the tap."""
+        with self.run_lifecycle():
+            super().sync_all()
+
+    @contextmanager
+    def run_lifecycle(self) -> Iterator[None]:
+        """Set up the output of a run, then finalise the tap's shared resources.
+
+        Profiles, the quota ledger and the inaccessible customers are written
+        even when the run fails. The record index is only committed after a
+        successful run.
+        """
+        try:
+            with ExitStack() as output:
+                if self.config.get("buffered_output"):
+                    writer = BufferedMessageWriter(
+                        buffer_size=self.config.get(
+                            "output_buffer_size", DEFAULT_BUFFER_SIZE
+                        ),
+                        flush_interval=self.config.get(
+                            "output_flush_interval", DEFAULT_FLUSH_INTERVAL
+                        ),
+                    )
+                    output.enter_context(buffered_output(writer))
+                yield
+        finally:
+            # Profiles of failed runs are written too, they are often the slow ones
+            if self.profiler is not None:
+                self.profiler.write()
+            if self.quota_planner is not None:
+                self.quota_planner.close()
+            self.customer_breaker.close()
+        if self.record_index is not None:
+            self.record_index.close()
@@ -0,0 +1,160 @@
+"""Tests the thread-safe token refresh of the authenticators."""
+
+import threading
+import unittest
+from datetime import timedelta
+
+import responses
+from singer_sdk.helpers._util import utc_now
+
+from tap_googleads.auth import ProxyGoogleAdsAuthenticator
+from tap_googleads.streams import AccessibleCustomers, CampaignsStream
+from tap_googleads.tap import TapGoogleAds
+
+PROXY_URL = "http://localhost:8080/api/tokens/oauth2-google/token"
+
+
+class SingleFlightTestAuthenticator(ProxyGoogleAdsAuthenticator):
+    """Authenticator with its own singleton instance, isolated from other tests"""
+
+
+class TestSingleFlightRefresh(unittest.TestCase):
+    """Test class for the single-flight token refresh"""
+
+    def setUp(self):
+        stream = CampaignsStream(
+            tap=TapGoogleAds({"customer_id": "1234", "developer_token": "1234"})
+        )
+        self.authenticator = SingleFlightTestAuthenticator(
+            stream=stream, auth_endpoint=PROXY_URL, auth_body={}, auth_headers={}
+        )
+        self.authenticator.access_token = None
+        self.authenticator.last_refreshed = None
+        responses.reset()
+
+    @responses.activate
+    def test_concurrent_workers_refresh_once(self):
+        """Test threads seeing an expired token share a single refresh"""
+        responses.add(
+            responses.POST,
+            PROXY_URL,
+            json={"access_token": "new_token", "expires_in": 3600},
+            status=200,
+        )
+        headers = []
+        workers = [
+            threading.Thread(
+                target=lambda: headers.append(self.authenticator.auth_headers)
+            )
+            for _ in range(8)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(
+            [h["Authorization"] for h in headers], ["Bearer new_token"] * 8
+        )
+
+    @responses.activate
+    def test_token_refreshed_before_expiry(self):
+        """Test a token about to expire is no longer considered valid"""
+        responses.add(
+            responses.POST,
+            PROXY_URL,
+            json={"access_token": "new_token", "expires_in": 3600},
+            status=200,
+        )
+        self.authenticator.update_access_token()
+        self.assertTrue(self.authenticator.is_token_valid())
+
+        # Refreshed 300 seconds before it expires
+        self.authenticator.last_refreshed = utc_now() - timedelta(seconds=3250)
+        self.assertTrue(self.authenticator.is_token_valid())
+        self.authenticator.last_refreshed = utc_now() - timedelta(seconds=3350)
+        self.assertFalse(self.authenticator.is_token_valid())
+
+        # Short lived tokens are refreshed halfway through their lifetime
+        self.authenticator.expires_in = 60
+        self.authenticator.last_refreshed = utc_now() - timedelta(seconds=31)
+        self.assertFalse(self.authenticator.is_token_valid())
+
+    @responses.activate
+    def test_rejected_token_refreshed_once(self):
+        """Test workers rejected with the same token share a single refresh"""
+        responses.add(
+            responses.POST,
+            PROXY_URL,
+            json={"access_token": "new_token", "expires_in": 3600},
+            status=200,
+        )
+        self.authenticator.access_token = "rejected_token"
+
+        self.authenticator.refresh_rejected_token("rejected_token")
+        self.authenticator.refresh_rejected_token("rejected_token")
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(self.authenticator.access_token, "new_token")
+
+
+class TestUnauthorizedRetry(unittest.TestCase):
+    """Test class for requests retried after their token was rejected"""
+
+    def setUp(self):
+        # Credentials unused by other tests, so the authenticator starts empty
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "unauthorized_retry",
+            },
+            "customer_id": "1234",
+            "developer_token": "1234",
+        }
+        responses.reset()
+
+    @responses.activate
+    def test_rejected_request_retried_with_new_token(self):
+        """Test a 401 response refreshes the token once and resends the request"""
+        token_url = (
+            "https://www.googleapis.com/oauth2/v4/token"
+            "?refresh_token=unauthorized_retry&client_id=1234"
+            "&client_secret=1234&grant_type=refresh_token"
+        )
+        api_url = (
+            "https://googleads.googleapis.com/v8/customers:listAccessibleCustomers"
+        )
+        responses.add(
+            responses.POST,
+            token_url,
+            json={"access_token": "rejected_token", "expires_in": 3600},
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            token_url,
+            json={"access_token": "new_token", "expires_in": 3600},
+            status=200,
+        )
+        responses.add(responses.GET, api_url, status=401)
+        responses.add(
+            responses.GET,
+            api_url,
+            json={"resourceNames": ["customers/1234"]},
+            status=200,
+        )
+        stream = AccessibleCustomers(tap=TapGoogleAds(self.mock_config))
+
+        records = list(stream.request_records(None))
+
+        self.assertEqual(records, [{"resourceNames": ["customers/1234"]}])
+        token_calls = [c for c in responses.calls if c.request.url == token_url]
+        api_calls = [c for c in responses.calls if c.request.url == api_url]
+        # The first token was fetched up front, the second one after the 401
+        self.assertEqual(len(token_calls), 2)
+        self.assertEqual(
+            [c.request.headers["Authorization"] for c in api_calls],
+            ["Bearer rejected_token", "Bearer new_token"],
+        )
@@ -0,0 +1,183 @@
+"""Tests the per-customer circuit breaker."""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import requests
+import responses
+import singer
+
+from tap_googleads.breaker import (
+    DEFAULT_TTL_HOURS,
+    CustomerCircuitBreaker,
+    access_error_code,
+)
+
+import tap_googleads.tests.utils as test_utils
+
+
+def make_response(status_code, body):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode("utf-8")
+    return response
+
+
+def google_ads_failure(error_code):
+    return {
+        "error": {
+            "code": 403,
+            "status": "PERMISSION_DENIED",
+            "details": [
+                {
+                    "@type": "type.googleapis.com/google.ads.googleads.v8.errors."
+                    + "GoogleAdsFailure",
+                    "errors": [{"errorCode": {"authorizationError": error_code}}],
+                }
+            ],
+        }
+    }
+
+
+class TestCustomerCircuitBreaker(unittest.TestCase):
+    """Test class for the per-customer circuit breaker"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "inaccessible.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_access_error_code(self):
+        """Test only permission and disabled customer errors are detected"""
+        self.assertEqual(
+            access_error_code(
+                make_response(403, google_ads_failure("CUSTOMER_NOT_ENABLED"))
+            ),
+            "CUSTOMER_NOT_ENABLED",
+        )
+        self.assertIsNone(
+            access_error_code(
+                make_response(403, google_ads_failure("DEVELOPER_TOKEN_NOT_APPROVED"))
+            )
+        )
+        self.assertIsNone(access_error_code(make_response(200, {"results": []})))
+
+    def test_tripped_customers_are_skipped(self):
+        """Test a tripped customer is skipped for the rest of the run"""
+        breaker = CustomerCircuitBreaker()
+        breaker.trip("1234", "USER_PERMISSION_DENIED")
+
+        self.assertTrue(breaker.is_open("1234"))
+        self.assertFalse(breaker.is_open("5678"))
+
+    def test_tripped_customers_saved_for_ttl(self):
+        """Test tripped customers are skipped by later runs within the TTL"""
+        breaker = CustomerCircuitBreaker(self.path, ttl_hours=1)
+        breaker.trip("1234", "USER_PERMISSION_DENIED")
+        breaker.close()
+        self.assertTrue(CustomerCircuitBreaker(self.path, ttl_hours=1).is_open("1234"))
+
+        breaker = CustomerCircuitBreaker(self.path, ttl_hours=1)
+        breaker.skipped["1234"]["until"] = 0
+        breaker.close()
+        self.assertFalse(CustomerCircuitBreaker(self.path, ttl_hours=1).is_open("1234"))
+
+    def test_path_alone_saves_for_default_ttl(self):
+        """Test tripped customers are saved for the default TTL without a TTL set"""
+        breaker = CustomerCircuitBreaker(self.path)
+        breaker.trip("1234", "CUSTOMER_NOT_ENABLED")
+        breaker.close()
+
+        saved = CustomerCircuitBreaker(self.path)
+        self.assertTrue(saved.is_open("1234"))
+        self.assertGreater(
+            saved.skipped["1234"]["until"],
+            time.time() + (DEFAULT_TTL_HOURS - 1) * 60 * 60,
+        )
+
+    @responses.activate
+    def test_sync_skips_streams_of_denied_customer(self):
+        """Test a denied customer's later streams are skipped, not other customers"""
+        singer.write_message = test_utils.accumulate_singer_messages
+        del test_utils.SINGER_MESSAGES[:]
+        mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "customer_id": "1234",
+            "developer_token": "1234",
+            "inaccessible_customers_path": self.path,
+            "inaccessible_customers_ttl_hours": 1,
+        }
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token?refresh_token=1234&client_id=1234"
+            + "&client_secret=1234&grant_type=refresh_token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v8/customers:listAccessibleCustomers",
+            json=test_utils.accessible_customer_return_data,
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/1234/googleAds:search",
+            json={
+                "results": [
+                    {"customerClient": {"id": "3", "level": "1", "manager": False}},
+                    {"customerClient": {"id": "4", "level": "1", "manager": False}},
+                ]
+            },
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/3/googleAds:search",
+            json=google_ads_failure("USER_PERMISSION_DENIED"),
+            status=403,
+        )
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/4/googleAds:search",
+            json={"results": [{"campaign": {"id": "1"}, "adGroup": {"id": "10"}}]},
+            status=200,
+        )
+
+        test_utils.set_up_tap_with_custom_catalog(
+            mock_config, ["stream_campaign", "stream_adgroups"]
+        ).sync_all()
+
+        searched = [
+            call.request.url.split("?")[0]
+            for call in responses.calls
+            if "googleAds:search" in call.request.url
+        ]
+        records = [
+            message.stream
+            for message in test_utils.SINGER_MESSAGES
+            if isinstance(message, singer.RecordMessage)
+        ]
+        self.assertEqual(
+            searched.count(
+                "https://googleads.googleapis.com/v8/customers/3/googleAds:search"
+            ),
+            1,
+        )
+        self.assertEqual(
+            searched.count(
+                "https://googleads.googleapis.com/v8/customers/4/googleAds:search"
+            ),
+            2,
+        )
+        self.assertEqual(sorted(records), ["stream_adgroups", "stream_campaign"])
+        self.assertTrue(CustomerCircuitBreaker(self.path, ttl_hours=1).is_open("3"))
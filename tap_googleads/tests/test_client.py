@@ -0,0 +1,113 @@
+"""Tests the GoogleAdsStream response handling."""
+
+import json
+import tracemalloc
+import unittest
+from unittest import mock
+
+import requests
+
+from tap_googleads.tap import TapGoogleAds
+from tap_googleads.streams import AccessibleCustomers, CampaignsStream
+
+
+def make_response(body: dict) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(body).encode("utf-8")
+    return response
+
+
+class TestGoogleAdsStreamResponses(unittest.TestCase):
+    """Test class for GoogleAdsStream response parsing"""
+
+    def setUp(self):
+        self.mock_config = {
+            "customer_id": "1234",
+            "developer_token": "1234",
+        }
+        self.tap = TapGoogleAds(self.mock_config)
+
+    def test_parse_results_page(self):
+        """Test report rows are yielded in order without decoding the page"""
+        stream = CampaignsStream(tap=self.tap)
+        response = make_response(
+            {
+                "results": [{"campaign": {"id": "1"}}, {"campaign": {"id": "2"}}],
+                "nextPageToken": "next",
+            }
+        )
+
+        with mock.patch.object(response, "json", wraps=response.json) as decode:
+            records = list(stream.parse_response(response))
+            token = stream.get_next_page_token(response, None)
+
+        self.assertEqual(
+            records, [{"campaign": {"id": "1"}}, {"campaign": {"id": "2"}}]
+        )
+        self.assertEqual(token, "next")
+        self.assertEqual(decode.call_count, 0)
+
+    def test_parse_results_page_formatting(self):
+        """Test pages are read with any whitespace and field order"""
+        stream = CampaignsStream(tap=self.tap)
+        response = requests.Response()
+        response._content = (
+            b'{\n  "fieldMask": "campaign.id",\n  "results": [\n'
+            b'    {"campaign": {"id": "1"}} ,\n    {"campaign": {"id": "2"}}\n  ]\n}'
+        )
+
+        self.assertEqual(
+            list(stream.parse_response(response)),
+            [{"campaign": {"id": "1"}}, {"campaign": {"id": "2"}}],
+        )
+        self.assertIsNone(stream.get_next_page_token(response, None))
+
+    def test_next_page_token_of_empty_page(self):
+        """Test the page token is read before or without reading any row"""
+        stream = CampaignsStream(tap=self.tap)
+        response = make_response({"results": [], "nextPageToken": "next"})
+
+        self.assertEqual(stream.get_next_page_token(response, None), "next")
+        self.assertEqual(list(stream.parse_response(response)), [])
+
+    def test_parse_results_page_memory(self):
+        """Benchmark the peak memory of reading a 10,000-row report page"""
+        stream = CampaignsStream(tap=self.tap)
+        row = {
+            "campaign": {
+                "resourceName": "customers/1234/campaigns/123456789",
+                "id": "123456789",
+                "name": "Brand",
+            },
+            "metrics": {"clicks": "12", "impressions": "3456", "conversions": 1.5},
+            "segments": {"date": "2021-03-01", "device": "MOBILE"},
+        }
+        body = {"results": [row] * 10000, "nextPageToken": "next"}
+
+        def peak_memory(read_page):
+            response = make_response(body)
+            tracemalloc.start()
+            try:
+                read_page(response)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        decoded = peak_memory(lambda response: response.json())
+        incremental = peak_memory(
+            lambda response: sum(1 for _ in stream.parse_response(response))
+        )
+
+        # The decoded page takes several times the size of the body
+        self.assertLess(incremental, decoded / 3)
+
+    def test_parse_other_jsonpath(self):
+        """Test streams not reading `$.results[*]` still use their jsonpath"""
+        stream = AccessibleCustomers(tap=self.tap)
+        response = make_response({"resourceNames": ["customers/1"]})
+
+        self.assertEqual(
+            list(stream.parse_response(response)),
+            [{"resourceNames": ["customers/1"]}],
+        )
@@ -0,0 +1,195 @@
+"""Tests the tap-googleads daemon."""
+
+import json
+import pathlib
+import socket
+import threading
+import unittest
+from datetime import datetime
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import requests
+import responses
+
+from tap_googleads import client
+from tap_googleads.daemon import serve
+from tap_googleads.tap import TapGoogleAds
+import tap_googleads.tests.utils as test_utils
+
+
+class FrozenDatetime(datetime):
+    """Datetime whose `now` is set by the test"""
+
+    current = datetime(2021, 3, 1, 12)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+class TestTapGoogleadsDaemon(unittest.TestCase):
+    """Test class for sync jobs sent to the daemon"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "customer_id": "1234",
+            "developer_token": "1234",
+        }
+        self.server = serve(port=0)
+        self.url = "http://127.0.0.1:%d/sync" % self.server.server_port
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        responses.reset()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        TapGoogleAds.shared_session = None
+        TapGoogleAds.discovery_cache = None
+
+    @responses.activate
+    def test_sync_jobs_stream_singer_messages(self):
+        """Test consecutive jobs are synced and their messages streamed back"""
+        responses.add_passthru("http://127.0.0.1")
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token?refresh_token=1234&client_id=1234"
+            + "&client_secret=1234&grant_type=refresh_token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v8/customers:listAccessibleCustomers",
+            json=test_utils.accessible_customer_return_data,
+            status=200,
+        )
+        job = {
+            "config": self.mock_config,
+            "catalog": test_utils.custom_catalog(
+                self.mock_config, ["stream_accessible_customers"]
+            ),
+        }
+
+        for _ in range(2):
+            response = requests.post(self.url, json=job)
+            messages = [json.loads(line) for line in response.iter_lines()]
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                [message["type"] for message in messages],
+                ["SCHEMA", "RECORD", "STATE"],
+            )
+            self.assertEqual(
+                messages[1]["record"], test_utils.accessible_customer_return_data
+            )
+
+    @responses.activate
+    def test_default_dates_follow_the_clock(self):
+        """Test the default date range moves forward between jobs"""
+        queries = []
+
+        def search(request):
+            queries.append(parse_qs(urlparse(request.url).query)["query"][0])
+            return 200, {}, json.dumps({"results": []})
+
+        responses.add_passthru("http://127.0.0.1")
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token?refresh_token=1234&client_id=1234"
+            + "&client_secret=1234&grant_type=refresh_token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v8/customers:listAccessibleCustomers",
+            json=test_utils.accessible_customer_return_data,
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/1234/googleAds:search",
+            json={"results": [{"customerClient": {"id": "3", "manager": False}}]},
+            status=200,
+        )
+        responses.add_callback(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/3/googleAds:search",
+            callback=search,
+        )
+        job = {
+            "config": self.mock_config,
+            "catalog": test_utils.custom_catalog(
+                self.mock_config, ["stream_geographic"]
+            ),
+        }
+
+        with mock.patch.object(client, "datetime", FrozenDatetime):
+            for day in (1, 2):
+                FrozenDatetime.current = datetime(2021, 3, day, 12)
+                response = requests.post(self.url, json=job)
+                self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(len(queries), 2)
+        self.assertIn(
+            "segments.date >= '2020-03-01' and segments.date <= '2021-03-01'",
+            queries[0],
+        )
+        self.assertIn(
+            "segments.date >= '2020-03-02' and segments.date <= '2021-03-02'",
+            queries[1],
+        )
+
+    @responses.activate
+    def test_schemas_reused_between_jobs(self):
+        """Test jobs with already discovered grains do not read schema files"""
+        responses.add_passthru("http://127.0.0.1")
+        read_text = pathlib.Path.read_text
+        schema_reads = []
+
+        def read_schema(path, *args, **kwargs):
+            schema_reads.append(path.name)
+            return read_text(path, *args, **kwargs)
+
+        # Discovering the catalog caches the schemas of the default grain
+        catalog = test_utils.custom_catalog(self.mock_config, [])
+        reads = []
+        with mock.patch.object(pathlib.Path, "read_text", read_schema):
+            for config in (
+                self.mock_config,
+                dict(self.mock_config, customer_id="5678"),
+                dict(self.mock_config, grain="month"),
+                dict(self.mock_config, grain="month"),
+            ):
+                del schema_reads[:]
+                response = requests.post(
+                    self.url, json={"config": config, "catalog": catalog}
+                )
+                self.assertEqual(response.status_code, 200)
+                reads.append(len(schema_reads))
+
+        self.assertEqual(reads[:2], [0, 0])
+        self.assertGreater(reads[2], 0)
+        self.assertEqual(reads[3], 0)
+
+    def test_idle_connection_does_not_block_jobs(self):
+        """Test jobs are served while another client keeps a connection open"""
+        idle = socket.create_connection(("127.0.0.1", self.server.server_port))
+        try:
+            response = requests.post(self.url, json={"catalog": {}}, timeout=5)
+        finally:
+            idle.close()
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_job(self):
+        """Test jobs without a config are rejected"""
+        response = requests.post(self.url, json={"catalog": {}})
+
+        self.assertEqual(response.status_code, 400)
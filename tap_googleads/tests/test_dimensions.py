@@ -0,0 +1,168 @@
+"""Tests the in-memory dimension index."""
+
+import json
+import os
+import tempfile
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+import responses
+
+from tap_googleads.dimensions import DimensionIndex
+from tap_googleads.tap import TapGoogleAds
+
+
+class FakeLoader:
+    """Dimension stream returning fixed records and counting its queries"""
+
+    def __init__(self, records):
+        self.records = records
+        self.contexts = []
+
+    def request_records(self, context):
+        self.contexts.append(context)
+        return iter(self.records)
+
+
+class TestDimensionIndex(unittest.TestCase):
+    """Test class for the dimension index"""
+
+    def setUp(self):
+        self.campaigns = FakeLoader(
+            [
+                {"campaign": {"id": "1", "name": "Brand"}},
+                {"campaign": {"id": "2", "name": "Generic"}},
+            ]
+        )
+        self.ad_groups = FakeLoader([{"adGroup": {"id": "10", "name": "Shoes"}}])
+
+    def make_index(self, max_entries=100):
+        index = DimensionIndex(max_entries)
+        index.loaders = {"campaign": self.campaigns, "adGroup": self.ad_groups}
+        return index
+
+    def test_enrich_loads_each_customer_once(self):
+        """Test fact records are enriched from a single load per customer"""
+        index = self.make_index()
+
+        first = index.enrich(
+            "1234",
+            {"campaign": {"id": "1"}, "adGroup": {"id": "10"}},
+            ["campaign", "adGroup"],
+        )
+        second = index.enrich("1234", {"campaign": {"id": "2"}}, ["campaign"])
+
+        self.assertEqual(first["campaign"], {"id": "1", "name": "Brand"})
+        self.assertEqual(first["adGroup"], {"id": "10", "name": "Shoes"})
+        self.assertEqual(second["campaign"], {"id": "2", "name": "Generic"})
+        self.assertEqual(self.campaigns.contexts, [{"client_id": "1234"}])
+
+    def test_unknown_id_is_left_as_is(self):
+        """Test records referencing an unknown dimension are not changed"""
+        index = self.make_index()
+
+        record = index.enrich("1234", {"campaign": {"id": "3"}}, ["campaign"])
+
+        self.assertEqual(record, {"campaign": {"id": "3"}})
+
+    def test_max_entries_evicts_oldest_customer(self):
+        """Test the least recently loaded tables are evicted when full"""
+        index = self.make_index(max_entries=2)
+
+        index.lookup("1", "campaign", "1")
+        index.lookup("2", "campaign", "1")
+        index.lookup("1", "campaign", "1")
+
+        self.assertEqual(
+            self.campaigns.contexts,
+            [{"client_id": "1"}, {"client_id": "2"}, {"client_id": "1"}],
+        )
+
+
+class TestConversionEnrichment(unittest.TestCase):
+    """Test class for conversion records enriched from the dimension index"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "customer_id": "1234",
+            "developer_token": "1234",
+        }
+        responses.reset()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def mock_search(self):
+        def search(request):
+            gaql = parse_qs(urlparse(request.url).query)["query"][0]
+            if "segments.conversion_action" in gaql:
+                results = [{"campaign": {"id": "1"}, "adGroup": {"id": "10"}}]
+            elif "FROM campaign" in gaql:
+                results = [{"campaign": {"id": "1", "name": "Brand"}}]
+            else:
+                results = [{"adGroup": {"id": "10", "name": "Shoes"}}]
+            return 200, {}, json.dumps({"results": results})
+
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token?refresh_token=1234&client_id=1234"
+            + "&client_secret=1234&grant_type=refresh_token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add_callback(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/1234/googleAds:search",
+            callback=search,
+        )
+
+    def conversion_stream(self, tap):
+        streams = {stream.name: stream for stream in tap.discover_streams()}
+        return streams["stream_conversions"]
+
+    @responses.activate
+    def test_conversions_select_ids_and_get_names(self):
+        """Test conversions only query ids and are enriched with names"""
+        self.mock_search()
+        stream = self.conversion_stream(TapGoogleAds(self.mock_config))
+
+        records = list(stream.get_records({"client_id": "1234"}))
+
+        self.assertIn("campaign.id", stream.gaql)
+        self.assertIn("ad_group.id", stream.gaql)
+        self.assertNotIn(".name", stream.gaql)
+        self.assertEqual(
+            records,
+            [
+                {
+                    "campaign": {"id": "1", "name": "Brand"},
+                    "adGroup": {"id": "10", "name": "Shoes"},
+                }
+            ],
+        )
+
+    @responses.activate
+    def test_dimension_loads_counted_against_fact_stream(self):
+        """Test dimension loads count against the job of the enriched stream"""
+        self.mock_search()
+        config = dict(
+            self.mock_config,
+            daily_operations_budget=100,
+            quota_ledger_path=os.path.join(self.tmp_dir.name, "quota.json"),
+        )
+        tap = TapGoogleAds(config)
+        stream = self.conversion_stream(tap)
+
+        list(stream.get_records({"client_id": "1234"}))
+        tap.quota_planner.close()
+
+        self.assertEqual(tap.quota_planner.used, 3)
+        self.assertEqual(
+            tap.quota_planner.job_estimates, {"1234/stream_conversions": 3}
+        )
@@ -0,0 +1,77 @@
+"""Tests the configurable reporting grain of date segmented streams."""
+
+import unittest
+
+from tap_googleads.tap import TapGoogleAds
+from tap_googleads.streams import GeographicStream, PerformanceStreamKeyword
+
+
+class TestTapGoogleadsGrain(unittest.TestCase):
+    """Test class for the reporting grain of date segmented streams"""
+
+    def setUp(self):
+        self.mock_config = {
+            "customer_id": "1234",
+            "developer_token": "1234",
+        }
+
+    def test_default_grain_is_daily(self):
+        """Test streams select segments.date when no grain is configured"""
+        stream = GeographicStream(tap=TapGoogleAds(self.mock_config))
+
+        self.assertEqual(stream.grain, "day")
+        self.assertIn("segments.date,", stream.gaql)
+        self.assertIn("date", stream.schema["properties"]["segments"]["properties"])
+
+    def test_grain_rewrites_gaql_and_schema(self):
+        """Test a configured grain is pushed down to GAQL and the schema"""
+        config = dict(self.mock_config, grain="month")
+        stream = GeographicStream(tap=TapGoogleAds(config))
+
+        self.assertIn("segments.month,", stream.gaql)
+        self.assertNotIn("segments.date,", stream.gaql)
+        # The date range filter is kept on segments.date
+        self.assertIn("WHERE segments.date >=", stream.gaql)
+
+        segments = stream.schema["properties"]["segments"]["properties"]
+        self.assertIn("month", segments)
+        self.assertNotIn("date", segments)
+
+    def test_stream_grain_overrides_grain(self):
+        """Test per-stream grains take precedence over the default grain"""
+        config = dict(
+            self.mock_config,
+            grain="month",
+            stream_grains={"stream_performance_keyword": "week"},
+        )
+        tap = TapGoogleAds(config)
+
+        self.assertEqual(PerformanceStreamKeyword(tap=tap).grain, "week")
+        self.assertEqual(GeographicStream(tap=tap).grain, "month")
+
+    def test_dates_snapped_to_grain_periods(self):
+        """Test the date range covers whole periods of the grain"""
+        config = dict(self.mock_config, start_date="2021-02-17", end_date="2021-05-05")
+        expected = {
+            "day": ("'2021-02-17'", "'2021-05-05'"),
+            "week": ("'2021-02-15'", "'2021-05-09'"),
+            "month": ("'2021-02-01'", "'2021-05-31'"),
+            "quarter": ("'2021-01-01'", "'2021-06-30'"),
+        }
+        for grain, (start_date, end_date) in expected.items():
+            stream = GeographicStream(tap=TapGoogleAds(dict(config, grain=grain)))
+
+            self.assertEqual(
+                (stream.start_date, stream.end_date), (start_date, end_date)
+            )
+            self.assertIn(
+                f"segments.date >= {start_date} and segments.date <= {end_date}",
+                stream.gaql,
+            )
+
+    def test_unsupported_grain(self):
+        """Test an unknown grain is rejected"""
+        config = dict(self.mock_config, grain="hour")
+
+        with self.assertRaises(ValueError):
+            GeographicStream(tap=TapGoogleAds(config))
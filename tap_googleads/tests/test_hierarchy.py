@@ -0,0 +1,171 @@
+"""Tests the customer hierarchy traversal."""
+
+import os
+import tempfile
+import unittest
+from urllib.parse import urlparse
+
+import responses
+import singer
+
+from tap_googleads.hierarchy import HierarchyCache
+from tap_googleads.streams import CustomerHierarchyStream
+from tap_googleads.tap import TapGoogleAds
+import tap_googleads.tests.utils as test_utils
+
+
+def customer_client(customer_id, level, manager):
+    return {
+        "customerClient": {
+            "id": customer_id,
+            "level": str(level),
+            "manager": manager,
+        }
+    }
+
+
+class TestCustomerHierarchy(unittest.TestCase):
+    """Test class for the customer hierarchy traversal"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "customer_id": "1234",
+            "developer_token": "1234",
+        }
+        responses.reset()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @responses.activate
+    def test_nested_clients_found_once(self):
+        """Test clients under sub-managers are found and deduplicated"""
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token?refresh_token=1234&client_id=1234"
+            + "&client_secret=1234&grant_type=refresh_token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/1234/googleAds:search",
+            json={
+                "results": [
+                    customer_client("1234", 0, True),
+                    customer_client("2", 1, True),
+                    customer_client("3", 1, False),
+                ]
+            },
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/2/googleAds:search",
+            json={
+                "results": [
+                    customer_client("2", 0, True),
+                    customer_client("3", 1, False),
+                    customer_client("4", 1, False),
+                ]
+            },
+            status=200,
+        )
+        stream = CustomerHierarchyStream(tap=TapGoogleAds(self.mock_config))
+
+        clients = stream.resolve_hierarchy("1234")
+
+        self.assertEqual(
+            [
+                (c["customerClient"]["id"], c["customerClient"]["level"])
+                for c in clients
+            ],
+            [("3", "1"), ("4", "2")],
+        )
+
+    @responses.activate
+    def test_children_synced_once_per_client(self):
+        """Test child streams query each distinct client once"""
+        singer.write_message = test_utils.accumulate_singer_messages
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token?refresh_token=1234&client_id=1234"
+            + "&client_secret=1234&grant_type=refresh_token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v8/customers:listAccessibleCustomers",
+            json=test_utils.accessible_customer_return_data,
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/1234/googleAds:search",
+            json={
+                "results": [
+                    customer_client("1234", 0, True),
+                    customer_client("2", 1, True),
+                    customer_client("3", 1, False),
+                ]
+            },
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/2/googleAds:search",
+            json={
+                "results": [
+                    customer_client("2", 0, True),
+                    customer_client("3", 1, False),
+                    customer_client("4", 1, False),
+                ]
+            },
+            status=200,
+        )
+        for client_id in ("3", "4"):
+            responses.add(
+                responses.POST,
+                f"https://googleads.googleapis.com/v8/customers/{client_id}"
+                "/googleAds:search",
+                json={"results": [{"campaign": {"id": client_id}}]},
+                status=200,
+            )
+
+        test_utils.set_up_tap_with_custom_catalog(
+            self.mock_config, ["stream_campaign"]
+        ).sync_all()
+
+        searched = [
+            urlparse(call.request.url).path
+            for call in responses.calls
+            if "googleAds:search" in call.request.url
+        ]
+        self.assertEqual(
+            sorted(searched),
+            [
+                "/v8/customers/1234/googleAds:search",
+                "/v8/customers/2/googleAds:search",
+                "/v8/customers/3/googleAds:search",
+                "/v8/customers/4/googleAds:search",
+            ],
+        )
+
+    def test_cache_expires(self):
+        """Test cached hierarchies are only reused within their TTL"""
+        path = os.path.join(self.tmp_dir.name, "hierarchy.json")
+        clients = [customer_client("3", 1, False)]
+
+        HierarchyCache(path, ttl_hours=1).put("1234", clients)
+        self.assertEqual(HierarchyCache(path, ttl_hours=1).get("1234"), clients)
+        self.assertIsNone(HierarchyCache(path, ttl_hours=1).get("5678"))
+
+        HierarchyCache(path, ttl_hours=-1).put("1234", clients)
+        self.assertIsNone(HierarchyCache(path, ttl_hours=1).get("1234"))
@@ -0,0 +1,104 @@
+"""Tests the per-stream profiler."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import responses
+import singer
+
+from tap_googleads.profiling import StreamProfiler
+
+import tap_googleads.tests.utils as test_utils
+
+
+class TestStreamProfiler(unittest.TestCase):
+    """Test class for the per-stream profiler"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_nested_streams_are_profiled_separately(self):
+        """Test parent and child streams each get a profile and a summary"""
+        profiler = StreamProfiler(self.tmp_dir.name, top_n=5, trace_memory=True)
+
+        with profiler.profile("stream_parent"):
+            sorted(range(1000))
+            with profiler.profile("stream_child"):
+                sum(range(1000))
+        profiler.write()
+
+        directory = Path(self.tmp_dir.name)
+        self.assertTrue((directory / "stream_parent.prof").exists())
+        self.assertTrue((directory / "stream_child.prof").exists())
+        summary = (directory / "summary.txt").read_text()
+        self.assertIn("==== stream_parent ====", summary)
+        self.assertIn("==== stream_child ====", summary)
+        self.assertIn("allocation sites", summary)
+
+    def test_memory_reports_growth_during_stream(self):
+        """Test allocation sites are those grown while the stream was synced"""
+        profiler = StreamProfiler(self.tmp_dir.name, top_n=5, trace_memory=True)
+        allocated_before = [str(i) for i in range(50000)]
+
+        with profiler.profile("stream_child"):
+            allocated_during = [str(i) * 2 for i in range(10000)]
+        profiler.write()
+
+        # Memory allocated before the stream started is not reported
+        top_site = profiler._memory_stats["stream_child"][0]
+        self.assertEqual(top_site.traceback[0].filename, __file__)
+        self.assertGreater(top_site.size_diff, 0)
+        self.assertEqual(top_site.size_diff, top_site.size)
+        self.assertEqual(len(allocated_before), len(allocated_during) * 5)
+
+    @responses.activate
+    def test_sync_profiles_each_stream(self):
+        """Test a tap sync with `profile_dir` profiles parent and child streams"""
+        singer.write_message = test_utils.accumulate_singer_messages
+        mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "customer_id": "1234",
+            "developer_token": "1234",
+            "profile_dir": self.tmp_dir.name,
+        }
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token?refresh_token=1234&client_id=1234"
+            + "&client_secret=1234&grant_type=refresh_token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v8/customers:listAccessibleCustomers",
+            json=test_utils.accessible_customer_return_data,
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/1234/googleAds:search",
+            json={"results": [{"customerClient": {"id": "3", "manager": False}}]},
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/3/googleAds:search",
+            json={"results": [{"campaign": {"id": "1"}}]},
+            status=200,
+        )
+
+        test_utils.set_up_tap_with_custom_catalog(
+            mock_config, ["stream_campaign"]
+        ).sync_all()
+
+        directory = Path(self.tmp_dir.name)
+        for stream_name in ("stream_customer_hierarchy", "stream_campaign"):
+            self.assertTrue((directory / f"{stream_name}.prof").exists())
@@ -0,0 +1,232 @@
+"""Tests the daily API operations budget planner."""
+
+import json
+import os
+import tempfile
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+import responses
+import singer
+
+from tap_googleads.quota import QuotaPlanner, quota_date
+
+import tap_googleads.tests.utils as test_utils
+
+
+class TestQuotaPlanner(unittest.TestCase):
+    """Test class for the quota planner"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ledger_path = os.path.join(self.tmp_dir.name, "quota.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_ledger(self, ledger):
+        with open(self.ledger_path, "w") as ledger_file:
+            json.dump(ledger, ledger_file)
+
+    def test_streams_deferred_once_budget_is_used(self):
+        """Test streams estimated above the remaining budget are not admitted"""
+        self.write_ledger(
+            {
+                "date": quota_date(),
+                "operations": 90,
+                "estimates": {"stream_performance_keyword": 20},
+            }
+        )
+        planner = QuotaPlanner(100, ledger_path=self.ledger_path)
+
+        self.assertEqual(planner.remaining, 10)
+        self.assertFalse(planner.admit("stream_performance_keyword"))
+        self.assertTrue(planner.admit("stream_campaign"))
+
+    def test_usage_resets_on_a_new_quota_day(self):
+        """Test operations used on a previous day do not count"""
+        self.write_ledger({"date": "2000-01-01", "operations": 100})
+        planner = QuotaPlanner(100, ledger_path=self.ledger_path)
+
+        self.assertEqual(planner.remaining, 100)
+
+    def test_close_learns_estimates(self):
+        """Test the ledger keeps today's usage and per stream estimates"""
+        planner = QuotaPlanner(100, ledger_path=self.ledger_path)
+        for _ in range(2):
+            planner.admit("stream_performance_keyword")
+            for _ in range(3):
+                planner.record_operation("stream_performance_keyword")
+        planner.close()
+
+        planner = QuotaPlanner(100, ledger_path=self.ledger_path)
+        self.assertEqual(planner.used, 6)
+        self.assertEqual(planner.estimate("stream_performance_keyword"), 3)
+
+    def test_pending_higher_priority_jobs_reserve_budget(self):
+        """Test jobs are deferred while they would starve higher priority jobs"""
+        planner = QuotaPlanner(
+            2,
+            ledger_path=self.ledger_path,
+            priorities={"stream_ads": 10},
+        )
+        planner.plan(
+            [
+                ("stream_ads", "3"),
+                ("stream_campaign", "3"),
+                ("stream_ads", "4"),
+                ("stream_campaign", "4"),
+            ]
+        )
+
+        self.assertTrue(planner.admit("stream_ads", "3"))
+        planner.record_operation("stream_ads", "3")
+        self.assertFalse(planner.admit("stream_campaign", "3"))
+        self.assertTrue(planner.admit("stream_ads", "4"))
+        planner.record_operation("stream_ads", "4")
+        self.assertFalse(planner.admit("stream_campaign", "4"))
+
+    def test_estimates_per_customer(self):
+        """Test jobs are estimated per customer, falling back to the stream"""
+        planner = QuotaPlanner(100, ledger_path=self.ledger_path)
+        planner.admit("stream_ads", "3")
+        for _ in range(4):
+            planner.record_operation("stream_ads", "3")
+        planner.admit("stream_ads", "4")
+        for _ in range(2):
+            planner.record_operation("stream_ads", "4")
+        planner.close()
+
+        planner = QuotaPlanner(100, ledger_path=self.ledger_path)
+        self.assertEqual(planner.estimate("stream_ads", "3"), 4)
+        self.assertEqual(planner.estimate("stream_ads", "4"), 2)
+        self.assertEqual(planner.estimate("stream_ads", "5"), 3)
+
+    def test_priorities(self):
+        """Test configured priorities default to 0"""
+        planner = QuotaPlanner(
+            100,
+            ledger_path=self.ledger_path,
+            priorities={"stream_performance_keyword": 10},
+        )
+
+        self.assertEqual(planner.priority("stream_performance_keyword"), 10)
+        self.assertEqual(planner.priority("stream_campaign"), 0)
+
+    @responses.activate
+    def test_sync_records_operations_in_ledger(self):
+        """Test every API request of a sync is counted in the ledger"""
+        singer.write_message = test_utils.accumulate_singer_messages
+        mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "customer_id": "1234",
+            "developer_token": "1234",
+            "daily_operations_budget": 100,
+            "quota_ledger_path": self.ledger_path,
+        }
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token?refresh_token=1234&client_id=1234"
+            + "&client_secret=1234&grant_type=refresh_token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v8/customers:listAccessibleCustomers",
+            json=test_utils.accessible_customer_return_data,
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/1234/googleAds:search",
+            json={
+                "results": [
+                    {"customerClient": {"id": "1234", "level": "0", "manager": False}}
+                ]
+            },
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/1234/googleAds:search",
+            json={"results": [{"campaign": {"id": "1"}}]},
+            status=200,
+        )
+
+        test_utils.set_up_tap_with_custom_catalog(
+            mock_config, ["stream_campaign"]
+        ).sync_all()
+
+        with open(self.ledger_path) as ledger_file:
+            ledger = json.load(ledger_file)
+        self.assertEqual(ledger["operations"], 3)
+        self.assertEqual(ledger["estimates"]["stream_campaign"], 1)
+
+    @responses.activate
+    def test_priorities_hold_across_customers(self):
+        """Test low priority streams of early customers do not starve later ones"""
+        singer.write_message = test_utils.accumulate_singer_messages
+        mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "customer_id": "1234",
+            "developer_token": "1234",
+            # Listing customers, the hierarchy and two child jobs
+            "daily_operations_budget": 4,
+            "quota_ledger_path": self.ledger_path,
+            "stream_priorities": {"stream_ads": 10},
+        }
+
+        def search(request):
+            gaql = parse_qs(urlparse(request.url).query)["query"][0]
+            if "FROM customer_client" in gaql:
+                results = [
+                    {"customerClient": {"id": "3", "level": "1", "manager": False}},
+                    {"customerClient": {"id": "4", "level": "1", "manager": False}},
+                ]
+            elif "FROM ad_group_ad" in gaql:
+                results = [{"adGroupAd": {"ad": {"id": "1"}}}]
+            else:
+                results = [{"campaign": {"id": "1"}}]
+            return 200, {}, json.dumps({"results": results})
+
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token?refresh_token=1234&client_id=1234"
+            + "&client_secret=1234&grant_type=refresh_token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v8/customers:listAccessibleCustomers",
+            json=test_utils.accessible_customer_return_data,
+            status=200,
+        )
+        for customer_id in ("1234", "3", "4"):
+            responses.add_callback(
+                responses.POST,
+                f"https://googleads.googleapis.com/v8/customers/{customer_id}"
+                "/googleAds:search",
+                callback=search,
+            )
+
+        test_utils.set_up_tap_with_custom_catalog(
+            mock_config, ["stream_campaign", "stream_ads"]
+        ).sync_all()
+
+        synced = [
+            (urlparse(call.request.url).path.split("/")[3], "FROM ad_group_ad" in gaql)
+            for call in responses.calls
+            if "googleAds:search" in call.request.url
+            for gaql in parse_qs(urlparse(call.request.url).query)["query"]
+        ]
+        self.assertEqual(synced, [("1234", False), ("3", True), ("4", True)])
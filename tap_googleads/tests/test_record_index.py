@@ -0,0 +1,64 @@
+"""Tests the content-hash record index."""
+
+import os
+import tempfile
+import unittest
+
+from tap_googleads.record_index import RecordIndex, SECONDS_PER_DAY
+
+
+class TestRecordIndex(unittest.TestCase):
+    """Test class for the record index"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "index.sqlite")
+        self.record = {"campaign": {"id": "1", "name": "Campaign"}}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_unchanged_records_are_suppressed_across_runs(self):
+        """Test a record is only reported as changed when its content changes"""
+        index = RecordIndex(self.path)
+        self.assertTrue(index.is_changed("stream_campaign", ["1"], self.record))
+        index.close()
+
+        index = RecordIndex(self.path)
+        self.assertFalse(index.is_changed("stream_campaign", ["1"], self.record))
+        changed = {"campaign": {"id": "1", "name": "Renamed"}}
+        self.assertTrue(index.is_changed("stream_campaign", ["1"], changed))
+        # The same key in another stream is indexed separately
+        self.assertTrue(index.is_changed("stream_ads", ["1"], self.record))
+        index.close()
+
+    def test_uncommitted_runs_are_discarded(self):
+        """Test records indexed by a run that did not close are emitted again"""
+        index = RecordIndex(self.path)
+        index.is_changed("stream_campaign", ["1"], self.record)
+        index.connection.close()
+
+        index = RecordIndex(self.path)
+        self.assertTrue(index.is_changed("stream_campaign", ["1"], self.record))
+        index.close()
+
+    def test_prune_max_entries(self):
+        """Test pruning keeps the most recently seen entries"""
+        index = RecordIndex(self.path, max_entries=2)
+        index.run_started -= 10
+        index.is_changed("stream_campaign", ["1"], self.record)
+        index.run_started += 10
+        index.is_changed("stream_campaign", ["2"], self.record)
+        index.is_changed("stream_campaign", ["3"], self.record)
+
+        self.assertEqual(index.prune(), 1)
+        self.assertTrue(index.is_changed("stream_campaign", ["1"], self.record))
+
+    def test_prune_max_age(self):
+        """Test pruning removes entries not seen within max_age_days"""
+        index = RecordIndex(self.path, max_age_days=1)
+        index.run_started -= 2 * SECONDS_PER_DAY
+        index.is_changed("stream_campaign", ["1"], self.record)
+        index.run_started += 2 * SECONDS_PER_DAY
+
+        self.assertEqual(index.prune(), 1)
@@ -0,0 +1,137 @@
+"""Tests recording and replaying raw API responses."""
+
+import json
+import tempfile
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+import responses
+import singer
+
+import tap_googleads.tests.utils as test_utils
+
+
+class TestTapGoogleadsRecordReplay(unittest.TestCase):
+    """Test class for the record and replay modes"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "customer_id": "1234",
+            "developer_token": "1234",
+            "replay_archive_dir": self.tmp_dir.name,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+        singer.write_message = test_utils.accumulate_singer_messages
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @responses.activate
+    def test_record_then_replay(self):
+        """Test a recorded run can be replayed without calling the API"""
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token?refresh_token=1234&client_id=1234"
+            + "&client_secret=1234&grant_type=refresh_token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v8/customers:listAccessibleCustomers",
+            json=test_utils.accessible_customer_return_data,
+            status=200,
+        )
+        test_utils.set_up_tap_with_custom_catalog(
+            dict(self.mock_config, replay_mode="record"),
+            ["stream_accessible_customers"],
+        ).sync_all()
+        recorded_messages = list(test_utils.SINGER_MESSAGES)
+        recorded_calls = len(responses.calls)
+
+        del test_utils.SINGER_MESSAGES[:]
+        test_utils.set_up_tap_with_custom_catalog(
+            dict(self.mock_config, replay_mode="replay"),
+            ["stream_accessible_customers"],
+        ).sync_all()
+
+        self.assertEqual(len(responses.calls), recorded_calls)
+        self.assertEqual(len(test_utils.SINGER_MESSAGES), len(recorded_messages))
+        self.assertEqual(
+            test_utils.SINGER_MESSAGES[1].record, recorded_messages[1].record
+        )
+
+    @responses.activate
+    def test_record_then_replay_paged_report(self):
+        """Test every page of a report stream is recorded and replayed"""
+
+        def customer_client(customer_id, level, manager):
+            return {
+                "customerClient": {
+                    "id": customer_id,
+                    "level": level,
+                    "manager": manager,
+                }
+            }
+
+        def search(request):
+            query = parse_qs(urlparse(request.url).query)
+            if "customer_client" in query["query"][0]:
+                results = [
+                    customer_client("1234", "0", True),
+                    customer_client("5678", "1", False),
+                ]
+                return 200, {}, json.dumps({"results": results})
+            if "pageToken" not in query:
+                page = {"results": [{"campaign": {"id": "1"}}], "nextPageToken": "2"}
+            else:
+                page = {"results": [{"campaign": {"id": "2"}}]}
+            return 200, {}, json.dumps(page)
+
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token?refresh_token=1234&client_id=1234"
+            + "&client_secret=1234&grant_type=refresh_token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v8/customers:listAccessibleCustomers",
+            json=test_utils.accessible_customer_return_data,
+            status=200,
+        )
+        responses.add_callback(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/1234/googleAds:search",
+            callback=search,
+        )
+        responses.add_callback(
+            responses.POST,
+            "https://googleads.googleapis.com/v8/customers/5678/googleAds:search",
+            callback=search,
+        )
+        test_utils.set_up_tap_with_custom_catalog(
+            dict(self.mock_config, replay_mode="record"), ["stream_campaign"]
+        ).sync_all()
+        recorded_calls = len(responses.calls)
+
+        del test_utils.SINGER_MESSAGES[:]
+        test_utils.set_up_tap_with_custom_catalog(
+            dict(self.mock_config, replay_mode="replay"), ["stream_campaign"]
+        ).sync_all()
+
+        self.assertEqual(len(responses.calls), recorded_calls)
+        records = [
+            message.record
+            for message in test_utils.SINGER_MESSAGES
+            if isinstance(message, singer.RecordMessage)
+        ]
+        self.assertEqual([record["campaign"]["id"] for record in records], ["1", "2"])
@@ -0,0 +1,96 @@
+"""Tests the buffered Singer message writer."""
+
+import datetime
+import decimal
+import io
+import json
+import unittest
+
+import singer
+
+from tap_googleads.writer import (
+    BufferedMessageWriter,
+    _json_dumps,
+    _orjson_dumps,
+    buffered_output,
+    orjson,
+)
+from tap_googleads.writer_benchmark import run
+
+
+class TestBufferedMessageWriter(unittest.TestCase):
+    """Test class for the buffered message writer"""
+
+    def setUp(self):
+        self.output = io.StringIO()
+        self.messages = [
+            singer.SchemaMessage(
+                stream="stream_campaign", schema={"type": "object"}, key_properties=[]
+            ),
+            singer.RecordMessage(
+                stream="stream_campaign",
+                record={"campaign": {"id": "1", "name": "Brand"}},
+                time_extracted=datetime.datetime(
+                    2021, 1, 1, tzinfo=datetime.timezone.utc
+                ),
+            ),
+            singer.RecordMessage(
+                stream="stream_campaign", record={"campaign": {"id": "2"}}, version=3
+            ),
+            singer.StateMessage(value={"bookmarks": {}}),
+        ]
+
+    def test_messages_match_singer_format(self):
+        """Test messages decode to the same values as the singer-python writer"""
+        writer = BufferedMessageWriter(self.output, flush_interval=60)
+        for message in self.messages:
+            writer.write_message(message)
+        writer.flush()
+
+        lines = self.output.getvalue().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [json.loads(singer.format_message(m)) for m in self.messages],
+        )
+
+    def test_decimals_keep_their_precision(self):
+        """Test decimals are written exactly, with and without orjson"""
+        record = {"metrics": {"costMicros": decimal.Decimal("12345678901234.567891")}}
+        encoders = [_json_dumps]
+        if hasattr(orjson, "Fragment"):
+            encoders.append(_orjson_dumps)
+
+        for dumps in encoders:
+            self.assertEqual(
+                dumps(record), '{"metrics":{"costMicros":12345678901234.567891}}'
+            )
+
+    def test_messages_buffered_until_full(self):
+        """Test messages are only written once the buffer is full"""
+        writer = BufferedMessageWriter(self.output, buffer_size=1000, flush_interval=60)
+
+        writer.write_message(self.messages[1])
+        self.assertEqual(self.output.getvalue(), "")
+
+        for _ in range(20):
+            writer.write_message(self.messages[1])
+        self.assertNotEqual(self.output.getvalue(), "")
+
+    def test_buffered_output_flushes_on_exit(self):
+        """Test singer.write_message is redirected and restored"""
+        write_message = singer.write_message
+        writer = BufferedMessageWriter(self.output, flush_interval=60)
+
+        with buffered_output(writer):
+            singer.write_message(self.messages[1])
+
+        self.assertIs(singer.write_message, write_message)
+        self.assertEqual(len(self.output.getvalue().splitlines()), 1)
+
+    def test_benchmark_runs(self):
+        """Test the throughput benchmark measures every available writer"""
+        rates = run(100)
+
+        self.assertIn("singer-python", rates)
+        self.assertIn("buffered, simplejson", rates)
+        self.assertEqual("buffered, orjson" in rates, hasattr(orjson, "Fragment"))
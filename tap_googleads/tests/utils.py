@@ -19,6 +19,14 @@ def accumulate_singer_messages(message):
 
 def set_up_tap_with_custom_catalog(mock_config, stream_list):
 
+    # Initialise tap with new catalog
+    return TapGoogleAds(
+        config=mock_config, catalog=custom_catalog(mock_config, stream_list)
+    )
+
+
+def custom_catalog(mock_config, stream_list):
+
     tap = TapGoogleAds(config=mock_config)
     # Run discovery
     tap.run_discovery()
@@ -32,5 +40,4 @@ def set_up_tap_with_custom_catalog(mock_config, stream_list):
             stream_name=stream,
             selected=True,
         )
-    # Initialise tap with new catalog
-    return TapGoogleAds(config=mock_config, catalog=catalog.to_dict())
+    return catalog.to_dict()
@@ -0,0 +1,142 @@
+"""Buffered writer of Singer messages."""
+
+import datetime
+import decimal
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import simplejson
+import singer
+from singer import utils
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None  # type: ignore[assignment]
+
+if sys.version_info >= (3, 8):
+    from typing import Protocol
+else:  # pragma: no cover - typing_extensions is installed on older Pythons
+    from typing_extensions import Protocol
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+class MessageOutput(Protocol):
+    """Text stream Singer messages are written to, e.g. stdout."""
+
+    def write(self, text: str) -> Any:
+        """Write text to the stream."""
+
+    def flush(self) -> None:
+        """Flush text written to the stream."""
+
+
+# Like singer-python, decimals are written as exact JSON numbers. One encoder is
+# reused, simplejson builds a new one on each call with non-default options
+_JSON_ENCODER = simplejson.JSONEncoder(
+    separators=(",", ":"), use_decimal=True, default=str
+)
+
+
+def _json_dumps(value: Any) -> str:
+    return _JSON_ENCODER.encode(value)
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, decimal.Decimal):
+        return orjson.Fragment(str(value))
+    return str(value)
+
+
+def _orjson_dumps(value: Any) -> str:
+    return orjson.dumps(value, default=_orjson_default).decode("utf-8")
+
+
+class BufferedMessageWriter:
+    """Write Singer messages to a text stream in large buffered writes.
+
+    RECORD messages of a stream always start with the same keys, so that prefix
+    is encoded once per stream and only the record itself is encoded for each
+    message. Messages are encoded with orjson when it is installed, in a version
+    able to write decimals without losing precision (3.9 and later).
+    """
+
+    def __init__(
+        self,
+        output: Optional[MessageOutput] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        """Create a new message writer.
+
+        Args:
+            output: Text stream written to, defaults to stdout.
+            buffer_size: Buffered characters that trigger a flush.
+            flush_interval: Seconds after which buffered messages are flushed.
+        """
+        self.output: MessageOutput = output or sys.stdout
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.dumps: Callable[[Any], str] = (
+            _orjson_dumps if hasattr(orjson, "Fragment") else _json_dumps
+        )
+        self._record_prefixes: Dict[str, str] = {}
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+
+    def _encode_record(self, message: singer.RecordMessage) -> str:
+        prefix = self._record_prefixes.get(message.stream)
+        if prefix is None:
+            prefix = '{"type":"RECORD","stream":' + self.dumps(message.stream)
+            prefix += ',"record":'
+            self._record_prefixes[message.stream] = prefix
+        parts = [prefix, self.dumps(message.record)]
+        if message.version is not None:
+            parts.append(',"version":' + self.dumps(message.version))
+        if message.time_extracted:
+            time_extracted = utils.strftime(
+                message.time_extracted.astimezone(datetime.timezone.utc)
+            )
+            parts.append(',"time_extracted":' + self.dumps(time_extracted))
+        parts.append("}\n")
+        return "".join(parts)
+
+    def write_message(self, message: singer.Message) -> None:
+        """Buffer a message, flushing the buffer when it is full or stale."""
+        if isinstance(message, singer.RecordMessage):
+            line = self._encode_record(message)
+        else:
+            line = self.dumps(message.asdict()) + "\n"
+        self._buffer.append(line)
+        self._buffered += len(line)
+        if (
+            self._buffered >= self.buffer_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered messages to the output."""
+        if self._buffer:
+            self.output.write("".join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+        self.output.flush()
+        self._last_flush = time.monotonic()
+
+
+@contextmanager
+def buffered_output(writer: BufferedMessageWriter) -> Iterator[None]:
+    """Send the Singer messages written in the enclosed block to `writer`."""
+    write_message = singer.write_message
+    singer.write_message = writer.write_message
+    try:
+        yield
+    finally:
+        writer.flush()
+        singer.write_message = write_message
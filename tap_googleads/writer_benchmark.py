@@ -0,0 +1,94 @@
+"""Benchmark the throughput of the buffered Singer message writer.
+
+RECORD messages shaped like `stream_performance_keyword` rows are written to
+the null device, with singer-python's writer and with BufferedMessageWriter,
+using each encoder available. Messages per second are printed for each:
+
+    python -m tap_googleads.writer_benchmark --messages 200000
+"""
+
+import argparse
+import contextlib
+import datetime
+import os
+import time
+from typing import Callable, Dict, List
+
+import singer
+
+from tap_googleads.writer import (
+    BufferedMessageWriter,
+    _json_dumps,
+    _orjson_dumps,
+    orjson,
+)
+
+DEFAULT_MESSAGES = 200000
+
+
+def keyword_messages(count: int) -> List[singer.RecordMessage]:
+    """Return RECORD messages the size of keyword performance rows."""
+    time_extracted = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        singer.RecordMessage(
+            stream="stream_performance_keyword",
+            record={
+                "campaign": {"id": "1234567890", "name": "Brand - Exact"},
+                "adGroup": {"id": "9876543210", "name": "Running shoes"},
+                "adGroupCriterion": {
+                    "criterionId": str(index),
+                    "keyword": {"text": "running shoes", "matchType": "EXACT"},
+                },
+                "metrics": {
+                    "clicks": "12",
+                    "impressions": "3456",
+                    "costMicros": "7890000",
+                    "conversions": 1.5,
+                    "conversionsValue": 42.25,
+                },
+                "segments": {"date": "2021-03-01", "device": "MOBILE"},
+            },
+            time_extracted=time_extracted,
+        )
+        for index in range(count)
+    ]
+
+
+def _rate(write: Callable[[singer.Message], None], messages: List) -> float:
+    start = time.perf_counter()
+    for message in messages:
+        write(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def run(count: int = DEFAULT_MESSAGES) -> Dict[str, float]:
+    """Return the messages per second written by each writer and encoder."""
+    messages = keyword_messages(count)
+    rates = {}
+    with open(os.devnull, "w") as null:
+        with contextlib.redirect_stdout(null):
+            rates["singer-python"] = _rate(singer.write_message, messages)
+
+        encoders = {"buffered, simplejson": _json_dumps}
+        if hasattr(orjson, "Fragment"):
+            encoders["buffered, orjson"] = _orjson_dumps
+        for name, dumps in encoders.items():
+            writer = BufferedMessageWriter(null)
+            writer.dumps = dumps
+            rates[name] = _rate(writer.write_message, messages)
+            writer.flush()
+    return rates
+
+
+def main() -> None:
+    """Print the throughput of each writer."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=DEFAULT_MESSAGES)
+    args = parser.parse_args()
+
+    for name, rate in run(args.messages).items():
+        print(f"{name:<22} {rate:>10,.0f} messages/s")
+
+
+if __name__ == "__main__":
+    main()